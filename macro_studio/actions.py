@@ -1,13 +1,27 @@
-import pydirectinput, pyperclip
+import itertools
 import numpy as np
+import pydirectinput, pyperclip
 from contextlib import contextmanager
 from PySide6.QtCore import QPoint
 from pydirectinput import MOUSE_PRIMARY
 
 from macro_studio.core.types_and_enums import TaskInterruptedException
+from macro_studio.core.execution import direct_input
 
 pydirectinput.PAUSE = 0.0
 
+# Bound once so the input helpers below skip the module attribute lookups on every press/click
+_keyDown = direct_input.keyDown
+_keyUp = direct_input.keyUp
+_press = pydirectinput.press
+_mouseDown = direct_input.mouseDown
+_mouseUp = direct_input.mouseUp
+
+# Release jitter is drawn from one pregenerated batch instead of calling the PRNG on every click
+_JITTER_MASK = 4095
+_JITTER = np.random.default_rng().integers(-5, 5, size=_JITTER_MASK + 1).tolist()
+_jitter_idx = itertools.count()
+
 def taskSleep(duration: float=.01):
     """
     Non-blocking, yields control back to the worker for 'duration' seconds.
@@ -29,11 +43,11 @@ def taskWaitForResume():
 @contextmanager
 def holdKey(key_name: str):
     """Context manager that holds a key and guarantees its release."""
-    pydirectinput.keyDown(key_name)
+    _keyDown(key_name)
     try:
         yield  # Run the block inside the 'with' statement
     finally:
-        pydirectinput.keyUp(key_name)
+        _keyUp(key_name)
 
 def taskHoldKey(key_name: str, duration: float):
     """
@@ -57,14 +71,16 @@ def mouseClick(coords: QPoint=None, button: str=MOUSE_PRIMARY):
     """Context manager that holds a clicks at the coordinates and guarantees its mouse release."""
     x = y = None
     if coords: x, y = coords.x(), coords.y()
-    pydirectinput.mouseDown(x, y, button, tween=.05)
+    _mouseDown(x, y, button, tween=.05)
     try:
         yield  # Run the block inside the 'with' statement
     finally:
         if coords:
-            pydirectinput.mouseUp(x + np.random.randint(-5, 5), y + np.random.randint(-5, 5), button, tween=.05)
+            jitter_x = _JITTER[next(_jitter_idx) & _JITTER_MASK]
+            jitter_y = _JITTER[next(_jitter_idx) & _JITTER_MASK]
+            _mouseUp(x + jitter_x, y + jitter_y, button, tween=.05)
         else:
-            pydirectinput.mouseUp(None, None, button)
+            _mouseUp(None, None, button)
 
 def taskMouseClick(coords: QPoint=None, button: str=MOUSE_PRIMARY):
     """
@@ -93,9 +109,9 @@ def taskPasteText(text_to_paste: str):
 
         yield from taskSleep(0.05)
 
-        pydirectinput.keyDown('ctrl')
-        pydirectinput.press('v')
-        pydirectinput.keyUp('ctrl')
+        _keyDown('ctrl')
+        _press('v')
+        _keyUp('ctrl')
 
         yield from taskSleep(0.05)
     finally:
@@ -1,4 +1,3 @@
-from functools import wraps
 from typing import TYPE_CHECKING, Hashable
 
 from macro_studio.core.types_and_enums import LogLevel, TaskDeletedError
@@ -6,27 +5,49 @@ from macro_studio.core.types_and_enums import LogLevel, TaskDeletedError
 if TYPE_CHECKING:
     from macro_studio.core.controllers.task_controller import TaskController
 
+# Context class -> its deleted variant, built on first use
+_deleted_classes = {}
 
-def require_active_task(func):
-    """Decorator: Checks if the task is still alive before running the method."""
 
-    @wraps(func)
-    def wrapper(self: "TaskContext", *args, **kwargs):
-        is_valid = self.isValid()
+def _deletedMethod(name: str):
+    def deleted(self: "TaskContext", *args, **kwargs):
+        raise TaskDeletedError(
+            f"Handle Error: Task '{self._controller.name}' has been deleted and cannot be accessed."
+        )
 
-        if not is_valid:
-            raise TaskDeletedError(
-                f"Handle Error: Task '{self._controller.name}' has been deleted and cannot be accessed."
-            )
+    deleted.__name__ = name
+    return deleted
 
-        return func(self, *args, **kwargs)
 
-    return wrapper
+def markDeleted(context: "TaskContext"):
+    """
+    Switches the context to a variant whose guarded methods raise ``TaskDeletedError``.
+
+    Deletion is one-way, so live handles don't need to check it on every call.
+    """
+    context_cls = type(context)
+    deleted_cls = _deleted_classes.get(context_cls)
+    if deleted_cls is None:
+        namespace = {name: _deletedMethod(name) for name in context_cls._GUARDED_METHODS}
+        namespace['__slots__'] = ()
+        namespace['isValid'] = lambda self: False
+        deleted_cls = _deleted_classes[context_cls] = type(f"Deleted{context_cls.__name__}", (context_cls,), namespace)
+
+    # Same slots layout, so the class can be swapped in place
+    context.__class__ = deleted_cls
 
 
 class TaskContext:
+    __slots__ = ('_controller', '_is_paused', '_is_running', '_is_alive')
+    # Methods that raise TaskDeletedError once the task has been removed
+    _GUARDED_METHODS = ('setEnabled', 'restart', 'pause', 'resume', 'stop')
+
     def __init__(self, controller: "TaskController"):
         self._controller = controller
+        # Bound once, scripts tend to poll these state properties in their loops
+        self._is_paused = controller.isPaused
+        self._is_running = controller.isRunning
+        self._is_alive = controller.isAlive
 
     # --- Properties ---
     @property
@@ -40,12 +61,12 @@ class TaskContext:
     @property
     def is_paused(self) -> bool:
         """Read-only property. Returns True if the task is currently paused or interrupted."""
-        return self._controller.isPaused()
+        return self._is_paused()
 
     @property
     def is_running(self) -> bool:
         """Read-only property. Returns True if the task is running."""
-        return self._controller.isRunning()
+        return self._is_running()
 
     @property
     def is_alive(self) -> bool:
@@ -58,7 +79,7 @@ class TaskContext:
             True even if the master engine's global worker is currently paused
             or completely offline.
         """
-        return self._controller.isAlive()
+        return self._is_alive()
 
     # --- Methods ---
     def getName(self):
@@ -71,16 +92,13 @@ class TaskContext:
         """Safe method to check status without raising an error."""
         return self._controller.isValid()
 
-    @require_active_task
     def setEnabled(self, enabled: bool):
         self._controller.setEnabled(enabled)
 
-    @require_active_task
     def restart(self):
         """Kills the current instance of the task and starts a fresh one at the next work cycle."""
         self._controller.restart()
 
-    @require_active_task
     def pause(self, interrupt: bool = False):
         """
         If not paused already, halts the task from running its next step.
@@ -94,7 +112,6 @@ class TaskContext:
         """
         return self._controller.pause(interrupt)
 
-    @require_active_task
     def resume(self):
         """
         If the engine is running and task was previously paused, resumes from where it left off.
@@ -104,7 +121,6 @@ class TaskContext:
         """
         return self._controller.resume()
 
-    @require_active_task
     def stop(self):
         """Attempts to stop a task on its next cycle."""
         self._controller.stop()
@@ -1,25 +1,27 @@
 from typing import TYPE_CHECKING
-from .task_context import TaskContext, require_active_task
+from .task_context import TaskContext
 
 if TYPE_CHECKING:
     from macro_studio.core.controllers.threaded_controller import ThreadedController
 
 class ThreadContext(TaskContext):
+    __slots__ = ()
+    _GUARDED_METHODS = TaskContext._GUARDED_METHODS + ('sleep', 'waitForResume')
     _controller: "ThreadedController"
 
-    @require_active_task
-    def sleep(self, duration: float = 0.01):
+    def sleep(self, duration: float = 0.01, precise: bool = True):
         """
         Blocks the current thread with high precision.
         Args:
             duration: Duration to sleep the thread for in seconds.
+            precise: If ``False``, lets the OS wake the thread instead of spinning out the last few
+                milliseconds. Cheaper, but may overshoot by a timer tick.
         Raises:
             TaskAbortException: If stopped while sleeping.
             TaskInterruptedException: If interrupted while sleeping.
         """
-        self._controller.sleep(duration)
+        self._controller.sleep(duration, precise)
 
-    @require_active_task
     def waitForResume(self):
         """
         Blocks the thread **ONLY** if the system or this task is in an interrupted pause.
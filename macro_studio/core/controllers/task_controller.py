@@ -1,6 +1,5 @@
-import inspect, time
-from enum import Enum, auto
-from PySide6.QtCore import QMutex, QMutexLocker
+import functools, inspect, itertools, time, threading
+from enum import Enum
 from typing import TYPE_CHECKING, Generator, Hashable
 
 from macro_studio.core.types_and_enums import TaskInterruptedException, LogLevel
@@ -13,16 +12,32 @@ if TYPE_CHECKING:
 
 
 class TaskState(Enum):
-    RUNNING = auto()        # Actively executing or waiting for a wake cycle
-    PAUSED = auto()         # Soft paused (frozen in place, retaining local variables)
-    INTERRUPTED = auto()    # Successful hard paused (waiting for resume)
-    STOPPED = auto()        # Manual kill by the user
-    FINISHED = auto()       # Natural successful completion
-    CRASHED = auto()        # Died from an unhandled exception
-
-DEAD_STATES = (TaskState.STOPPED, TaskState.FINISHED, TaskState.CRASHED)
+    # Power of two values so the state predicates can test a whole group with one int AND
+    RUNNING = 1             # Actively executing or waiting for a wake cycle
+    PAUSED = 2              # Soft paused (frozen in place, retaining local variables)
+    INTERRUPTED = 4         # Successful hard paused (waiting for resume)
+    STOPPED = 8             # Manual kill by the user
+    FINISHED = 16           # Natural successful completion
+    CRASHED = 32            # Died from an unhandled exception
+
+    def __init__(self, flag):
+        # A plain instance attribute, reading it is much cheaper than the 'value' property or IntFlag math
+        self.flag = flag
+
+PAUSED_MASK = TaskState.PAUSED.flag | TaskState.INTERRUPTED.flag
+DEAD_MASK = TaskState.STOPPED.flag | TaskState.FINISHED.flag | TaskState.CRASHED.flag
+# Wake times are integer time.perf_counter_ns() values so the scheduler heap only compares ints
+NS_PER_SECOND = 1_000_000_000
+# Returned by stepIfCurrent when the controller was reset after the worker popped it
+STALE_STEP = object()
 
 class TaskController:
+    # The worker reads these every tick, slots make those reads cheaper and drop the per-instance dict
+    __slots__ = ('worker', 'manager', 'func', 'repeat', '_wants_controller', '_controller_first', '_is_gen_func',
+                 'state_change_by_worker', 'context', 'name', '_state', '_pause_timestamp', '_wake_time',
+                 '_is_enabled', '_mutex', '_id', '_generator', '_next_generation', '_generation', '_task_args',
+                 '_task_kwargs', '_spawn')
+
     def __init__(
             self,
             manager: "TaskManager",
@@ -38,20 +53,31 @@ class TaskController:
         self.manager = manager
         self.func = task_func
         self.repeat = repeat
+        # The task function never changes, so introspect it once instead of on every generator rebuild
+        params = list(inspect.signature(task_func).parameters)
+        self._wants_controller = 'controller' in params
+        self._controller_first = bool(params) and params[0] == 'controller'
+        self._is_gen_func = inspect.isgeneratorfunction(task_func)
         self.state_change_by_worker = False
         self.context = self._createContext()
         self.name = unique_name or task_id
 
         self._state = TaskState.RUNNING if is_enabled else TaskState.STOPPED
-        self._pause_timestamp = 0.0
-        self._wake_time = 0.0
+        self._pause_timestamp = 0
+        self._wake_time = 0
         self._is_enabled = is_enabled
-        self._mutex = QMutex()
+        # A plain lock is enough for these few-line sections and is far cheaper to take than a QMutex
+        self._mutex = threading.Lock()
         self._id = task_id
         self._generator: Generator | None = None
+        # Bumped on every reset so stale heap entries can be told apart. A count is a single C call to advance
+        # and never hands out the same value twice, even if two threads race on it
+        self._next_generation = itertools.count(1).__next__
         self._generation = 0
-        self._task_args = task_args
+        self._task_args = tuple(task_args)
         self._task_kwargs = task_kwargs if task_kwargs is not None else {}
+        # The function and its arguments never change, so bind them once and every respawn is a single call
+        self._spawn = functools.partial(self._tryWrapFunc, self.func, *self._getArgsAndKwargs())
 
     def _createContext(self):
         """
@@ -60,15 +86,15 @@ class TaskController:
         """
         return TaskContext(self)
 
+    # The worker reads/writes these every tick. A single attribute load or store is already atomic under
+    # the GIL, so the mutex is only needed where the generator itself is touched.
     @property
     def wake_time(self):
-        with QMutexLocker(self._mutex):
-            return self._wake_time
+        return self._wake_time
 
     @wake_time.setter
     def wake_time(self, value):
-        with QMutexLocker(self._mutex):
-            self._wake_time = value
+        self._wake_time = value
 
     @property
     def cid(self):
@@ -80,6 +106,7 @@ class TaskController:
     def setEnabled(self, enabled: bool):
         if self._is_enabled == enabled: return
         self._is_enabled = enabled
+        self.manager.onControllerEnabledChanged(self, enabled)
         if enabled:
             self.restart()
         else:
@@ -89,10 +116,10 @@ class TaskController:
         return self._is_enabled
 
     def isAlive(self):
-        return self._generator is not None and self._state not in DEAD_STATES
+        return self._generator is not None and not self._state.flag & DEAD_MASK
 
     def isPaused(self):
-        return self._state in (TaskState.PAUSED, TaskState.INTERRUPTED)
+        return self._state.flag & PAUSED_MASK != 0
 
     def isRunning(self):
         return self._state == TaskState.RUNNING
@@ -103,12 +130,12 @@ class TaskController:
     def isValid(self):
         return self.manager.getController(self.name) is not None
 
-    def _unsafeResetGenerator(self, new_state: TaskState, wake_time: float=None):
-        self._generation += 1
+    def _unsafeResetGenerator(self, new_state: TaskState, wake_time: int=None):
+        self._generation = self._next_generation()
         self._wake_time = wake_time or 0
         self._state = new_state
         self.state_change_by_worker = False
-        self._generator = self._tryWrapFunc(*self._getArgsAndKwargs(self.func)) if new_state not in DEAD_STATES else None
+        self._generator = self._spawn() if not new_state.flag & DEAD_MASK else None
 
     def throwInterruptedError(self, by_worker=False):
         """
@@ -116,79 +143,115 @@ class TaskController:
         Returns:
             ``True`` if the task is still alive, ``False`` otherwise.
         """
-        with QMutexLocker(self._mutex):
-            if not self._generator: return False
+        while True:
+            self._mutex.acquire()
             try:
+                generator = self._generator
+                if not generator: return False
+                # Paused states keep the worker from starting another step while we wait on this one
                 self._state = TaskState.INTERRUPTED
-                self._generator.throw(TaskInterruptedException)
-            except (StopIteration, TaskInterruptedException):
-                # If there's nothing left in our generator, the interrupt was not handled correctly
-                self._unsafeResetGenerator(new_state=TaskState.CRASHED)
-            self.state_change_by_worker = by_worker
+                if not generator.gi_running:
+                    try:
+                        generator.throw(TaskInterruptedException)
+                    except (StopIteration, TaskInterruptedException):
+                        # If there's nothing left in our generator, the interrupt was not handled correctly
+                        self._unsafeResetGenerator(new_state=TaskState.CRASHED)
+                    self.state_change_by_worker = by_worker
+                    break
+
+                if self.worker.isWorkerThread():
+                    # The task is interrupting itself mid-step, raise straight into its own code instead
+                    self.state_change_by_worker = by_worker
+                    raise TaskInterruptedException
+            finally:
+                self._mutex.release()
+
+            # __next__ doesn't lock, so let the step that's running on the worker finish first. Waited on unlocked,
+            # the step may stop or restart its own task, which takes the lock. Then re-check whatever generator is current
+            while generator.gi_running:
+                time.sleep(0.001)
         return self.isAlive()
 
-    def _unsafeGetSortKey(self):
-        return self._wake_time, self._id, self._generation
-
-    def _getArgsAndKwargs(self, func):
-        sig = inspect.signature(func)
+    def getSortId(self):
+        """The id and generation packed into one int, so heap ties need a single compare to break."""
+        return (self._id << 32) | (self._generation & 0xFFFFFFFF)
 
-        # Convert the tuple to a mutable list so we can inject into it
-        final_args = list(self._task_args)
-        final_kwargs = dict(self._task_kwargs)
+    def _unsafeGetSortKey(self):
+        return self._wake_time, self.getSortId()
 
-        # Intelligently inject the Context Wrapper
-        if 'controller' in sig.parameters:
-            params = list(sig.parameters.keys())
+    def _getArgsAndKwargs(self):
+        """Builds the call arguments from the introspection cached in ``__init__``."""
+        if not self._wants_controller:
+            return self._task_args, self._task_kwargs
 
-            # If the scriptwriter put 'controller' as the very first argument
-            if params and params[0] == 'controller':
-                # Shift all user args to the right by inserting at index 0
-                final_args.insert(0, self.context)
-            else:
-                # Otherwise, safely pass it as a keyword argument
-                final_kwargs['controller'] = self.context
+        # If the scriptwriter put 'controller' as the very first argument, shift the user args to the right
+        if self._controller_first:
+            return (self.context, *self._task_args), self._task_kwargs
 
-        return func, final_args, final_kwargs
+        # Otherwise, safely pass it as a keyword argument
+        return self._task_args, {**self._task_kwargs, 'controller': self.context}
 
     def _tryWrapFunc(self, func, final_args, final_kwargs):
         """If the function isn't a generator, wraps it into a generator function"""
-        if inspect.isgeneratorfunction(func):
-            yield from func(*final_args, **final_kwargs)
-        else:
-            func(*final_args, **final_kwargs)
-            yield
-
-    def resetGeneratorAndGetSortKey(self, new_state: TaskState = TaskState.RUNNING, wake_time: float = None):
+        if self._is_gen_func:
+            # Hand back the task's own generator, a 'yield from' wrapper would add a frame to every step
+            return func(*final_args, **final_kwargs)
+        return self._wrapPlainFunc(func, final_args, final_kwargs)
+
+    @staticmethod
+    def _wrapPlainFunc(func, final_args, final_kwargs):
+        # No yield in the body, so the step that runs the function also finishes the task
+        # instead of taking another scheduler round trip just to hit StopIteration
+        func(*final_args, **final_kwargs)
+        return
+        yield
+
+    def resetGeneratorAndGetSortKey(self, new_state: TaskState = TaskState.RUNNING, wake_time: int = None):
         """
         Creates a new generator (if new state is not stopped) and destroys the old one.
         Returns:
             The sort key
         """
-        with QMutexLocker(self._mutex):
+        self._mutex.acquire()
+        try:
             prev_gen = self._generator
             self._unsafeResetGenerator(new_state=new_state, wake_time=wake_time)
 
             # Close the old generator to trigger its 'finally' cleanup blocks
             if prev_gen:
-                prev_gen.close()
+                try:
+                    prev_gen.close()
+                except ValueError:
+                    # It's mid-step on the worker (or stopping itself). Dropping our reference defers the
+                    # close until the step returns and the generator is collected.
+                    pass
 
             return self._unsafeGetSortKey()
+        finally:
+            self._mutex.release()
 
     def stop(self, by_worker=False, state=TaskState.STOPPED):
-        self.resetGeneratorAndGetSortKey(state)
+        # Already dead with nothing to close, so skip the generator reset. Mass stops on shutdown hit this a lot.
+        if self._generator is None and self._state.flag & DEAD_MASK:
+            self._state = state
+        else:
+            self.resetGeneratorAndGetSortKey(state)
         self.state_change_by_worker = by_worker
 
-    def restart(self, wake_time: float=None):
+    def restart(self, wake_time: int=None):
         """
         Kills the current instance of the task and starts a fresh one at the next work cycle.
         Args:
-            wake_time: The wake time for the task to run at after restarting.
+            wake_time: The ``time.perf_counter_ns()`` time for the task to run at after restarting.
         """
+        # Disabled tasks stay stopped until they're enabled again
+        if not self.isEnabled(): return
         self.worker.moveToActiveAndReschedule(self, self.resetGeneratorAndGetSortKey(wake_time=wake_time))
 
     def pause(self, interrupt=False):
         """Halts the task and shifts its internal state."""
+        # Nothing left to pause
+        if self._state.flag & DEAD_MASK: return False
         self.state_change_by_worker = False
 
         target_state = TaskState.INTERRUPTED if interrupt else TaskState.PAUSED
@@ -198,7 +261,7 @@ class TaskController:
             return True
 
         self._state = target_state
-        self._pause_timestamp = time.perf_counter()
+        self._pause_timestamp = time.perf_counter_ns()
 
         if not interrupt or self.throwInterruptedError():
             return True
@@ -208,28 +271,33 @@ class TaskController:
 
     def resume(self):
         """Resumes the task, calculating how long it was frozen."""
-        was_hard_pause = self.isInterrupted()
+        # Spurious resume on a running (or dead) task, nothing to undo
+        if not self.isPaused(): return None
 
-        elapsed = None
-        if self.worker.isAlive() and self.isPaused():
-            elapsed = time.perf_counter() - self._pause_timestamp
+        was_hard_pause = self.isInterrupted()
+        # Kept in integer ns until it's returned, it gets added straight onto the wake time
+        elapsed_ns = time.perf_counter_ns() - self._pause_timestamp if self.worker.isAlive() else None
 
         self._state = TaskState.RUNNING
         self.state_change_by_worker = False
-        self._pause_timestamp = 0.0
+        self._pause_timestamp = 0
+
+        if elapsed_ns is None:
+            return None
 
-        if elapsed is not None:
-            with QMutexLocker(self._mutex):
-                self._generation += 1
-                self._wake_time = 0 if was_hard_pause else (self._wake_time + elapsed)
-                self.worker.moveToActiveAndReschedule(self, self._unsafeGetSortKey())
+        # Nothing in here can raise, so a bare acquire/release pair is enough
+        self._mutex.acquire()
+        self._generation = self._next_generation()
+        self._wake_time = 0 if was_hard_pause else (self._wake_time + elapsed_ns)
+        sort_key = self._unsafeGetSortKey()
+        self._mutex.release()
+        self.worker.moveToActiveAndReschedule(self, sort_key)
 
-        return elapsed
+        return elapsed_ns / NS_PER_SECOND
 
     def getGeneration(self):
         """Atomic way to get the current generation"""
-        with QMutexLocker(self._mutex):
-            return self._generation
+        return self._generation
 
     def resumeFromWorkerPause(self, delay: float=None):
         """
@@ -239,9 +307,11 @@ class TaskController:
             * If no delay is provided, resets the wake time to 0.
         """
         self._state = TaskState.RUNNING
-        with QMutexLocker(self._mutex):
-            self._wake_time = 0 if delay is None else (self._wake_time + delay)
-            return self._wake_time, self._id, self._generation
+        self._mutex.acquire()
+        self._wake_time = 0 if delay is None else (self._wake_time + int(delay * NS_PER_SECOND))
+        sort_key = self._unsafeGetSortKey()
+        self._mutex.release()
+        return sort_key
 
     def log(self, *args, level: LogLevel=LogLevel.INFO):
         global_logger.log(*args, level=level, task_name=self.name)
@@ -260,7 +330,6 @@ class TaskController:
         """
         assert scheduler is not None
         self.worker = scheduler
-        self._mutex = QMutex()
         prev_gen = self._generator
         if prev_gen:
             self._generator = None
@@ -269,12 +338,30 @@ class TaskController:
             except ValueError:
                 global_logger.log(f"Task '{self.name}' caused a thread deadlock. Execution aborted without safe cleanup.", level=LogLevel.ERROR, task_name=-1)
             del prev_gen
-        self._generation = -1
+        self._generation = self._next_generation()
         self.stop()
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        with QMutexLocker(self._mutex):
-            return next(self._generator)
\ No newline at end of file
+        # Lock-free: restart/stop swap the generator under the mutex and tolerate closing one that's running,
+        # so the snapshot is all we need here
+        generator = self._generator
+        if generator is None:
+            # Stopped between being popped and run, the stale sort id drops it on the next pass
+            return None
+        return next(generator)
+
+    def stepIfCurrent(self, sort_id: int):
+        """
+        Steps the generator only if the controller wasn't reset since ``sort_id`` was scheduled.
+        Returns:
+            The generator's yielded value, or ``STALE_STEP`` if the scheduled entry went stale.
+        """
+        generator = self._generator
+        # A reset bumps the generation before it swaps the generator, so a matching id after the snapshot means
+        # the snapshot is the current generator
+        if generator is None or self.getSortId() != sort_id:
+            return STALE_STEP
+        return next(generator)
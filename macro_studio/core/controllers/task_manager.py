@@ -1,5 +1,6 @@
 import time
-from typing import TYPE_CHECKING, Union
+from collections import ChainMap
+from typing import TYPE_CHECKING
 from PySide6.QtCore import QObject, Signal, QTimer
 from PySide6.QtWidgets import QMessageBox
 
@@ -10,23 +11,39 @@ from macro_studio.core.utils import global_logger
 from .task_controller import TaskController
 from .threaded_controller import ThreadedController
 from macro_studio.core.data import Profile, TaskModel
+from macro_studio.api.task_context import markDeleted
 
 
 if TYPE_CHECKING:
     from macro_studio.core.data.profile import TaskRelationship
 
 DEADLOCK_TIME_MS = 200
-WORKER_MONITOR_RATE_MS = 2000
+# How long stop/pause wait inline for the worker before the rest is left to the deadlock timer
+HALT_GRACE_MS = 5
 PULSE_DEADLOCK_DURATION_S = 5.0
 
 class ManualTaskController(TaskController):
+    __slots__ = ('relationship', '_var_store', '_task_model', '_wrapper')
+
     def __init__(self, manager, var_store, relationship: "TaskRelationship", cid: int):
         task_model = manager.profile.tasks.getTaskById(relationship.task_id)
         self.relationship = relationship
-        self._wrapper = ManualTaskWrapper(var_store, task_model)
-        super().__init__(manager=manager, task_func=self._wrapper.runTask, task_id=cid, repeat=relationship.repeat,
+        # Translating the steps is the expensive part, so the wrapper waits until the task first runs
+        self._var_store = var_store
+        self._task_model = task_model
+        self._wrapper: ManualTaskWrapper | None = None
+        super().__init__(manager=manager, task_func=ManualTaskWrapper.runTask, task_id=cid, repeat=relationship.repeat,
                          unique_name=task_model.name, is_enabled=relationship.is_enabled)
 
+    def _getWrapper(self):
+        if self._wrapper is None:
+            self._wrapper = ManualTaskWrapper(self._var_store, self._task_model)
+        return self._wrapper
+
+    def _tryWrapFunc(self, func, final_args, final_kwargs):
+        # The wrapper is built lazily, so run its generator directly instead of the unbound runTask
+        return self._getWrapper().runTask()
+
     @property
     def repeat(self):
         return self.relationship.repeat
@@ -44,43 +61,64 @@ class ManualTaskController(TaskController):
         return super().setEnabled(enabled)
 
     def updateModel(self, task_model: "TaskModel"):
-        self._wrapper.updateModel(task_model)
+        self._task_model = task_model
+        if self._wrapper is not None: self._wrapper.updateModel(task_model)
 
     def resetGeneratorAndGetSortKey(self, *args, **kwargs):
-        results = super().resetGeneratorAndGetSortKey(**kwargs)
-        self._wrapper.resetState()
+        results = super().resetGeneratorAndGetSortKey(*args, **kwargs)
+        # Never ran, so nothing can be held down
+        if self._wrapper is not None: self._wrapper.resetState()
         return results
 
 class TaskManager(QObject):
     finished_signal = Signal()
+    halted_signal = Signal(bool) # (Is Pause) A stop or pause that outlasted the inline wait went through
     def __init__(self, engine, profile: "Profile"):
         super().__init__()
 
         self.engine = engine
         self.profile = profile
-        self.controllers: dict[str | int, TaskController] = {}
+        # Manual tasks are keyed by name and scripted ones by id, so each dict only ever holds one key type
+        self._manual: dict[str, ManualTaskController] = {}
+        self._programmatic: dict[int, TaskController] = {}
+        # Live read-only view over both, for lookups and iteration that don't care about the kind
+        self.controllers: ChainMap[str | int, TaskController] = ChainMap(self._manual, self._programmatic)
+        # Kept in step with setEnabled, so starting the worker doesn't have to scan every controller
+        self._enabled_controllers: set[TaskController] = set()
         self.next_cid = 0
         self._loop_delay = 0.001
         self.worker = self._createAndMonitorWorker()
 
+        # Single shot, re-armed for exactly when the current heartbeat would go stale instead of polling
         self.watchdog_timer = QTimer()
+        self.watchdog_timer.setSingleShot(True)
+
+        # Started when a halt doesn't settle inline, the kill dialog only comes up if it runs out
+        self.deadlock_timer = QTimer()
+        self.deadlock_timer.setSingleShot(True)
+        self.deadlock_timer.setInterval(DEADLOCK_TIME_MS - HALT_GRACE_MS)
+        # Is Pause of the halt still waiting on the worker, or None if there isn't one
+        self._pending_halt: bool | None = None
+        self._halt_by_watchdog = False
+        self._kill_dialog: QMessageBox | None = None
 
         tasks = profile.tasks
-        tasks.taskRemoved.connect(self._onManualTaskRemoved)
+        tasks.tasksRemoved.connect(self._onManualTasksRemoved)
         tasks.taskSaved.connect(self._onManualTaskSaved)
-        tasks.taskRenamed.connect(self._onManualTaskRenamed)
+        tasks.tasksRenamed.connect(self._onManualTasksRenamed)
         profile.relationshipCreated.connect(self._onRelationshipCreated)
         self.watchdog_timer.timeout.connect(self._checkWorkerHealth)
+        self.deadlock_timer.timeout.connect(self._onHaltTimeout)
 
         self.profile.loaded.connect(self._onProfileLoaded)
 
     @property
     def loop_delay(self):
-        return self.loop_delay
+        return self._loop_delay
 
     @loop_delay.setter
     def loop_delay(self, delay: float):
-        self.loop_delay = delay
+        self._loop_delay = delay
         self.worker.loop_delay = delay
 
     def createController(self, task_func, enabled: bool, repeat: bool, task_args, task_kwargs):
@@ -102,20 +140,37 @@ class TaskManager(QObject):
         return controller.context if controller else None
 
     def removeController(self, controller):
-        self.controllers.pop(controller.name, None)
+        removed = self._controllerDict(controller).pop(controller.name, None)
+        if removed:
+            self._enabled_controllers.discard(removed)
+            markDeleted(removed.context)
+
+    def onControllerEnabledChanged(self, controller: TaskController, enabled: bool):
+        # Removed controllers can still be toggled through a stale reference, they don't belong in the set
+        if self.controllers.get(controller.name) is not controller: return
+        if enabled:
+            self._enabled_controllers.add(controller)
+        else:
+            self._enabled_controllers.discard(controller)
 
     def startWorker(self):
+        """
+        Returns:
+            ``True`` if the worker started, ``False`` if the previous run is still halting.
+        """
+        if not self._settleFinishedHalt(): return False
         self.worker.clearPauseState(WorkerState.RUNNING)
         self.worker.reloadControllers(self._getEnabledControllers())
         global_logger.log("Starting Macro...")
         self.worker.start()
-        self.watchdog_timer.start(WORKER_MONITOR_RATE_MS)
+        self._armWatchdog(PULSE_DEADLOCK_DURATION_S)
+        return True
 
     def stopWorker(self):
         self.worker.clearPauseState(WorkerState.IDLE)
         self.watchdog_timer.stop()
         self.worker.handleStoppedEnd()
-        return self._tryShowKillDialog()
+        return self._awaitWorkerHalt()
 
     def pauseWorker(self, interrupt):
         """
@@ -126,117 +181,202 @@ class TaskManager(QObject):
                 * ``True``: Interrupts the task to **release keys** and **clean up resources** safely.
                 * ``False``: **Freezes** the task in place (keys remain held down).
          Returns:
-             ``True`` if paused successfully, ``False`` if could not stop the worker.
+             ``True`` if paused successfully, ``False`` if could not stop the worker right away.
         """
         if self.worker.pause(interrupt):
             self.watchdog_timer.stop()
-            return self._tryShowKillDialog(True)
+            return self._awaitWorkerHalt(True)
 
         return self.worker.isAlive()
 
     def resumeWorker(self):
+        # The pause is still going through, resuming now would leave it to land on the resumed run
+        if not self._settleFinishedHalt(): return None
         elapsed = self.worker.resume() if self.worker.isAlive() else None
-        if elapsed is not None: self.watchdog_timer.start(WORKER_MONITOR_RATE_MS)
+        if elapsed is not None: self._armWatchdog(PULSE_DEADLOCK_DURATION_S)
         return elapsed
 
+    def _armWatchdog(self, delay_s: float):
+        self.watchdog_timer.start(max(1, int(delay_s * 1000)))
+
     def _checkWorkerHealth(self):
-        if not self.worker.isRunning() or self.worker.isPaused():
+        if not self.worker.isRunning():
+            return
+        if self.worker.isPaused():
+            self._armWatchdog(PULSE_DEADLOCK_DURATION_S)
             return
 
         current_time = time.perf_counter()
         time_since_last_pulse = current_time - self.worker.last_heartbeat
 
-        if time_since_last_pulse > PULSE_DEADLOCK_DURATION_S:
+        if time_since_last_pulse <= PULSE_DEADLOCK_DURATION_S:
+            # Healthy, check back right when this heartbeat would go stale
+            self._armWatchdog(PULSE_DEADLOCK_DURATION_S - time_since_last_pulse)
+        else:
             global_logger.log(f"Engine Auto-Protect: A task has held the worker for {time_since_last_pulse:.2f} seconds without yielding.", level=LogLevel.WARN)
             # Try to pause the worker so the deadlock thing will come up
+            self._halt_by_watchdog = True
             if self.pauseWorker(False):
-                if self.worker.isAlive(): # Somehow the task pulled through, clear the pause
-                    self.worker.clearPauseState()
-                else:
-                    self.engine.cancelExecution()
+                self._onWatchdogPauseSettled()
+
+    def _onWatchdogPauseSettled(self):
+        self._halt_by_watchdog = False
+        if self.worker.isAlive(): # Somehow the task pulled through, clear the pause
+            self.worker.clearPauseState()
+        else:
+            self.engine.cancelExecution()
 
     def _createAndMonitorWorker(self):
         worker = TaskWorker(self.engine, self._loop_delay)
         for controller in self.controllers.values():
             controller.setScheduler(worker)
         worker.finished_signal.connect(self.finished_signal.emit)
+        worker.finished.connect(self._onWorkerHalted)
         return worker
 
-    def _tryShowKillDialog(self, is_pause=False):
-        if not self.worker.wait(DEADLOCK_TIME_MS):
-            msg_box = QMessageBox(self.engine.ui)
-            msg_box.setIcon(QMessageBox.Icon.Warning)
-            msg_box.setWindowTitle("Potential Task Deadlock Detected")
-            msg_box.setText("The task worker is completely unresponsive.")
-            msg_box.setInformativeText(f"A task has not yielded for longer than {DEADLOCK_TIME_MS}ms, halting task execution. Do you want to forcefully terminate the worker, or let it continue running?")
-
-            terminate_btn = msg_box.addButton("Force Terminate", QMessageBox.ButtonRole.DestructiveRole)
-            _continue_btn = msg_box.addButton("Let it Continue", QMessageBox.ButtonRole.RejectRole)
-
-            msg_box.exec()
-
-            if msg_box.clickedButton() == terminate_btn:
-                global_logger.log("User forcefully terminated the worker.", level=LogLevel.ERROR)
-                self.worker.terminate()  # The Nuclear Option
-                self.worker.wait()  # Wait for the OS to finish burying it
-                del self.worker
-                self.worker = self._createAndMonitorWorker()
-            else:
-                self.worker.clearPauseState()
-                global_logger.log("User chose to let the deadlocked task continue. Watchdog disabled for the remainder of this run", level=LogLevel.WARN)
-                return False # We walk away and let it keep spinning
-        elif not is_pause:
+    def _awaitWorkerHalt(self, is_pause=False):
+        """
+        Gives the worker a moment to halt inline, which covers any task that yields like it should.
+        Returns:
+            ``True`` if the worker halted already. ``False`` if it's still busy, ``halted_signal`` fires once it does
+            and the deadlock dialog comes up if that takes longer than ``DEADLOCK_TIME_MS``.
+        """
+        if self._pending_halt is not None:
+            # Still waiting on an earlier halt, a stop outranks a pause
+            self._pending_halt = self._pending_halt and is_pause
+            return False
+
+        if self.worker.wait(HALT_GRACE_MS):
+            self._onHaltSettled(is_pause)
+            return True
+
+        self._pending_halt = is_pause
+        self.deadlock_timer.start()
+        return False
+
+    def _onHaltSettled(self, is_pause):
+        if not is_pause:
             # The worker shut down naturally and safely within the timeframe!
             self.worker.reloadControllers(None)
+
+    def _takePendingHalt(self):
+        """Clears the pending halt, closing the kill dialog if it's up. Returns the halt's Is Pause or None."""
+        is_pause = self._pending_halt
+        self._pending_halt = None
+        self.deadlock_timer.stop()
+        if self._kill_dialog is not None:
+            kill_dialog = self._kill_dialog
+            self._kill_dialog = None
+            kill_dialog.close()
+            kill_dialog.deleteLater()
+        return is_pause
+
+    def _finishPendingHalt(self, is_pause):
+        if self._halt_by_watchdog:
+            self._onWatchdogPauseSettled()
+        else:
+            self.halted_signal.emit(is_pause)
+
+    def _settleFinishedHalt(self):
+        """
+        Settles a pending halt whose worker already finished, but whose ``finished`` hasn't been delivered yet.
+        Returns:
+            ``True`` if no halt is pending anymore, ``False`` if the worker is still busy halting.
+        """
+        if self._pending_halt is None: return True
+        if self.worker.isRunning(): return False
+        self._onWorkerHalted()
         return True
 
+    def _onWorkerHalted(self):
+        if self._pending_halt is None: return
+        is_pause = self._takePendingHalt()
+        self._onHaltSettled(is_pause)
+        self._finishPendingHalt(is_pause)
+
+    def _onHaltTimeout(self):
+        if self._pending_halt is None or self.worker.isFinished(): return
+        msg_box = self._kill_dialog = QMessageBox(self.engine.ui)
+        msg_box.setIcon(QMessageBox.Icon.Warning)
+        msg_box.setWindowTitle("Potential Task Deadlock Detected")
+        msg_box.setText("The task worker is completely unresponsive.")
+        msg_box.setInformativeText(f"A task has not yielded for longer than {DEADLOCK_TIME_MS}ms, halting task execution. Do you want to forcefully terminate the worker, or let it continue running?")
+
+        msg_box.addButton("Force Terminate", QMessageBox.ButtonRole.DestructiveRole)
+        msg_box.addButton("Let it Continue", QMessageBox.ButtonRole.RejectRole)
+
+        # Shown instead of exec'd so the UI keeps its own event loop, the answer comes back through the slot
+        msg_box.buttonClicked.connect(self._onKillDialogClicked)
+        msg_box.show()
+
+    def _onKillDialogClicked(self, button):
+        # The dialog may answer after the worker halted on its own, that already settled everything
+        if self._kill_dialog is None: return
+        terminate = self._kill_dialog.buttonRole(button) == QMessageBox.ButtonRole.DestructiveRole
+        is_pause = self._takePendingHalt()
+
+        if terminate:
+            global_logger.log("User forcefully terminated the worker.", level=LogLevel.ERROR)
+            self.worker.terminate()  # The Nuclear Option
+            self.worker.wait()  # Wait for the OS to finish burying it
+            # Same instance, so every controller keeps its scheduler and the signal connections stay put
+            self.worker.resetAfterTerminate()
+            self._finishPendingHalt(is_pause)
+        else:
+            self._halt_by_watchdog = False
+            self.worker.clearPauseState()
+            global_logger.log("User chose to let the deadlocked task continue. Watchdog disabled for the remainder of this run", level=LogLevel.WARN)
+            # We walk away and let it keep spinning
+
     def _getEnabledControllers(self):
-        return [controller for controller in self.controllers.values() if controller.isEnabled()]
+        return self._enabled_controllers
 
     def _onProfileLoaded(self):
-        stale_keys = []
-        for cid in self.controllers:
-            if isinstance(cid, str):
-                stale_keys.append(cid)
-
-        for cid in stale_keys:
-            self._onManualTaskRemoved(cid)
+        # Pull every manual task out in one go, then tear them down. Stopping never touches
+        # the worker, their old heap entries are dropped as stale generations when they come up
+        stale_controllers = list(self._manual.values())
+        self._manual.clear()
+        for controller in stale_controllers:
+            self._discardController(controller)
 
         for relationship in self.profile.task_relationships.values():
             self._onRelationshipCreated(relationship)
 
     def _registerController(self, controller: TaskController):
         self.next_cid += 1
-        self.controllers[controller.name] = controller
+        self._controllerDict(controller)[controller.name] = controller
+        if controller.isEnabled(): self._enabled_controllers.add(controller)
+
+    def _controllerDict(self, controller: TaskController) -> dict:
+        return self._manual if isinstance(controller, ManualTaskController) else self._programmatic
 
     def _onRelationshipCreated(self, relationship: "TaskRelationship"):
         self._registerController(ManualTaskController(self, self.profile.vars, relationship, self.next_cid))
 
-    def _onManualTaskRemoved(self, task: Union[TaskModel, str]):
-        task_name = task.name if isinstance(task, TaskModel) else task
-        if task_name in self.controllers:
-            controller = self.controllers.pop(task_name)
-            controller.stop()
-            del controller
+    def _onManualTasksRemoved(self, task_models: list[TaskModel]):
+        manual = self._manual
+        for task_model in task_models:
+            controller = manual.pop(task_model.name, None)
+            if controller is not None:
+                self._discardController(controller)
+
+    def _discardController(self, controller: TaskController):
+        """Stops a controller that was already taken out of the dict and invalidates its context."""
+        self._enabled_controllers.discard(controller)
+        controller.stop()
+        markDeleted(controller.context)
 
     def _onManualTaskSaved(self, task_model: "TaskModel"):
-        controller = self.controllers.get(task_model.name)
-        if isinstance(controller, ManualTaskController):
+        controller = self._manual.get(task_model.name)
+        # If it's missing, assume it is not added to this profile
+        if controller is not None:
             controller.updateModel(task_model)
-        elif controller is None:
-            # Assume it is not added to this profile
-            pass
-        else:
-            print(f"Warning: '{task_model.name}' is a {type(controller).__name__}, not a ManualTaskController.")
-
-    def _onManualTaskRenamed(self, old_name, task_model: "TaskModel"):
-        controller = self.controllers.get(old_name)
-        if isinstance(controller, ManualTaskController):
-            del self.controllers[controller.name]
-            controller.name = task_model.name
-            self.controllers[task_model.name] = controller
-        elif controller is None:
-            # Assume it is not added to this profile
-            pass
-        else:
-            print(f"Warning: '{old_name}' is a {type(controller).__name__}, not a ManualTaskController.")
\ No newline at end of file
+
+    def _onManualTasksRenamed(self, renames: list[tuple[str, "TaskModel"]]):
+        # Pull every controller out before re-keying, so tasks that swapped names don't overwrite each other
+        moved = [(self._manual.pop(old_name, None), task_model) for old_name, task_model in renames]
+        for controller, task_model in moved:
+            # If it's missing, assume it is not added to this profile
+            if controller is not None:
+                controller.name = task_model.name
+                self._manual[task_model.name] = controller
\ No newline at end of file
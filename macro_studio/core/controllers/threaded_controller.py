@@ -3,10 +3,18 @@ import time, threading
 from macro_studio.core.types_and_enums import TaskInterruptedException, TaskAbortException
 from macro_studio.api.thread_context import ThreadContext
 from macro_studio.actions import taskSleep, taskWaitForResume
-from .task_controller import TaskController, TaskState
+from .task_controller import TaskController, TaskState, PAUSED_MASK, NS_PER_SECOND
 
+# How often the bridge re-checks its thread in case the exit wake-up is ever missed
+THREAD_MONITOR_INTERVAL = 1.0
+# sleep() parks on the wake event down to PARK_THRESHOLD_NS left, yields down to SPIN_THRESHOLD_NS, then spins
+PARK_THRESHOLD_NS = 2_000_000
+SPIN_THRESHOLD_NS = 100_000
+MAX_PARK_NS = NS_PER_SECOND
 
 class ThreadedController(TaskController):
+    __slots__ = ('_os_thread', '_resume_event', '_wake_event')
+
     def __init__(
             self,
             manager,
@@ -23,23 +31,43 @@ class ThreadedController(TaskController):
         self._os_thread = None
         self._resume_event = threading.Event()
         self._resume_event.set()
+        # Set whenever the task's state changes so sleep() reacts immediately instead of on its next poll
+        self._wake_event = threading.Event()
 
     def _createContext(self):
         return ThreadContext(self)
 
-    def _unsafeResetGenerator(self, new_state: TaskState, wake_time: float=None):
-        is_pause = new_state in (TaskState.PAUSED, TaskState.INTERRUPTED)
+    def _unsafeResetGenerator(self, new_state: TaskState, wake_time: int=None):
+        is_pause = new_state.flag & PAUSED_MASK != 0
         if is_pause: self._resume_event.clear()
+        # Forget the previous run's thread so it can't wake the new bridge when it exits
+        self._os_thread = None
         super()._unsafeResetGenerator(new_state=new_state, wake_time=wake_time)
         if not is_pause: self._resume_event.set()
+        self._wake_event.set()
+
+    def _onThreadExit(self):
+        """Runs on the OS thread as it exits and wakes the bridge now, instead of on its next liveness poll."""
+        self._mutex.acquire()
+        try:
+            # Reset or stopped since this thread was spawned, the bridge it belonged to is gone
+            if self._os_thread is not threading.current_thread() or self._generator is None: return
+            self._generation = self._next_generation()
+            self._wake_time = 0
+            sort_key = self._unsafeGetSortKey()
+        finally:
+            self._mutex.release()
+        self.worker.moveToActiveAndReschedule(self, sort_key)
 
     def _tryWrapFunc(self, func, final_args, final_kwargs):
         """
         THE BRIDGE: Runs on the main worker thread.
         Spawns the OS thread and yields control back to the TaskWorker heap
-        while polling the thread's health.
+        until the thread wakes it on exit.
         """
         self._resume_event.set()
+        # Set right before the exit wake-up, the thread itself still reports alive until it fully unwinds
+        thread_done = threading.Event()
         def thread_target():
             """The actual code running inside the OS thread."""
             try:
@@ -54,29 +82,39 @@ class ThreadedController(TaskController):
             except Exception as e:
                 self._state = TaskState.CRASHED
                 self.logError(f"{str(e)}")
+            finally:
+                thread_done.set()
+                self._onThreadExit()
 
         # Spawn the thread
-        self._os_thread = threading.Thread(target=thread_target, daemon=True)
-        self._os_thread.start()
-        # Generator Polling Loop (Runs on the Worker Thread)
-        while self._os_thread.is_alive():
-            # If the OS thread crashed, pull the exception up into the main engine!
-            if self._state == TaskState.CRASHED:
-                self.stop(state=TaskState.CRASHED)
-                break
-
+        os_thread = self._os_thread = threading.Thread(target=thread_target, daemon=True)
+        os_thread.start()
+        # Generator Monitoring Loop (Runs on the Worker Thread)
+        while not thread_done.is_set():
             try:
-                # Short sleep to yield control back to the engine worker
-                yield from taskSleep(0.05)
+                # The thread wakes us as it exits, this long sleep is only a safety net
+                yield from taskSleep(THREAD_MONITOR_INTERVAL)
             except TaskInterruptedException:
                 # The Engine is Hard Paused.
                 # The THREAD should handle its own pausing via controller.sleep(),
                 # but WE (the monitor) must sit here and wait for the resume signal.
                 yield from taskWaitForResume()
 
+        # If the OS thread crashed, pull the exception up into the main engine!
+        # Checked once it's gone, since the thread marks the crash right before exiting
+        if self._state == TaskState.CRASHED:
+            self.stop(state=TaskState.CRASHED)
+
+    def throwInterruptedError(self, by_worker=False):
+        is_alive = super().throwInterruptedError(by_worker=by_worker)
+        self._wake_event.set()
+        return is_alive
+
     def pause(self, interrupt=False):
         self._resume_event.clear()
-        return super().pause(interrupt=interrupt)
+        result = super().pause(interrupt=interrupt)
+        self._wake_event.set()
+        return result
 
     def resume(self):
         elapsed = super().resume()
@@ -89,57 +127,79 @@ class ThreadedController(TaskController):
         self._resume_event.set()
         return key
 
-    def sleep(self, duration: float = .01):
+    def sleep(self, duration: float = .01, precise: bool = True):
         """
         Blocks the current thread with high precision.
         Args:
             duration: Duration to sleep the thread for in seconds.
+            precise: If ``False``, skips the yield/spin tail and lets the OS wake us, trading up to a
+                timer tick of accuracy for no CPU use at all.
         Raises:
             TaskAbortException: If stopped while sleeping.
         """
         if duration <= 0:
             return
 
-        start_time = time.perf_counter()
-        target_time = start_time + duration
+        # Bound once, the final stretch of a sleep spins through this loop
+        perf_counter_ns = time.perf_counter_ns
+        yield_core = time.sleep
+        is_alive = self.isAlive
+        is_interrupted = self.isInterrupted
+        worker_interrupted = self.worker.isInterrupted
+        resume_event = self._resume_event
+        is_resumed = resume_event.is_set
+        wake_event = self._wake_event
+        has_wake_signal = wake_event.is_set
+
+        # Integer ns on the scheduler's clock, so the loop never boxes a float until it parks
+        target_ns = perf_counter_ns() + int(duration * NS_PER_SECOND)
+        # Below this much time left we stop parking and yield/spin instead
+        park_threshold_ns = PARK_THRESHOLD_NS if precise else 0
 
         while True:
+            # Clear before checking state so a change made after the checks still wakes the wait below.
+            # clear() takes the event's lock, so only pay for it when something actually set it.
+            if has_wake_signal(): wake_event.clear()
+
             # Check for Death
-            if not self.isAlive():
+            if not is_alive():
                 raise TaskAbortException("Task stopped.")
 
             # Check for interrupt
-            if self.isInterrupted() or self.worker.isInterrupted():
-                self._resume_event.clear()
+            if is_interrupted() or worker_interrupted():
+                resume_event.clear()
                 raise TaskInterruptedException("Hard pause triggered!")
 
             # Check for Pause
-            if not self._resume_event.is_set():
+            if not is_resumed():
                 # FREEZE TIME: Calculate how much time was left
-                remaining_at_pause = target_time - time.perf_counter()
+                remaining_at_pause_ns = target_ns - perf_counter_ns()
 
                 # Wait while we're paused
-                self._resume_event.wait()
+                resume_event.wait()
 
-                target_time = time.perf_counter() + remaining_at_pause
+                target_ns = perf_counter_ns() + remaining_at_pause_ns
 
                 continue
 
-            current_time = time.perf_counter()
-            remaining = target_time - current_time
+            remaining_ns = target_ns - perf_counter_ns()
 
             # If time is up, we are done
-            if remaining <= 0:
+            if remaining_ns <= 0:
                 break
 
-            # Smart Sleep Logic
-            if remaining > 0.02:
-                # Sleep small chunks so we can react to Pause/Stop signals quickly
-                # Sleeping the full 'remaining' would make the method less accurate
-                time.sleep(min(remaining - 0.005, 0.1))
+            # Smart Sleep Logic: park, then yield, then spin as the deadline gets closer
+            if remaining_ns > park_threshold_ns:
+                # Pause/Stop/Interrupt (including the worker's, which reach us through stop and
+                # throwInterruptedError) set the wake event, so this returns as soon as the state changes.
+                # One long wait beats many short ones, the cap is only a safety net
+                wake_event.wait(min(remaining_ns - (park_threshold_ns >> 1), MAX_PARK_NS) / NS_PER_SECOND)
+            elif remaining_ns > SPIN_THRESHOLD_NS:
+                # Give the core away without parking, waking from a park could overshoot the deadline
+                yield_core(0)
             else:
-                # Spin-wait for the final millisecond precision
-                pass
+                # Spin-wait for the final microseconds
+                for _ in range(64): pass
 
     def waitForResume(self):
         """
@@ -148,7 +208,11 @@ class ThreadedController(TaskController):
         Raises:
             TaskAbortException: If stopped while waiting.
         """
-        self._resume_event.wait()
+        # Resume and stop both set the event, so this wakes immediately. The timeout is only a safety belt
+        # in case we die during the pause without the event being set
+        resume_event = self._resume_event
+        while not resume_event.wait(1.0):
+            if not (self.worker.isAlive() and self.isAlive()): break
 
         # If one of the two are no longer alive, throw abort exception
         if not (self.worker.isAlive() and self.isAlive()):
@@ -1,6 +1,21 @@
-import sqlite3, os
+import sqlite3, os, threading
+from contextlib import contextmanager
 from macro_studio.core.utils.logger import global_logger
 
+CACHED_STATEMENTS = 256
+
+
+def _setupIndexes(cursor):
+    """Initializes the secondary indexes. The UNIQUE constraints already index (profile_id, task_id) and (profile_id, key)."""
+    cursor.executescript("""
+        -- Profile.load reads a profile's tasks in creation order
+        CREATE INDEX IF NOT EXISTS idx_profile_tasks_profile_created ON profile_tasks(profile_id, created_at);
+        -- Removing a task (and the cascade from deleting it) looks its relationships up by task alone
+        CREATE INDEX IF NOT EXISTS idx_profile_tasks_task ON profile_tasks(task_id);
+        -- TaskStore.initialLoad reads every task in creation order
+        CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks(created_at);
+    """)
+
 
 def _setupTriggers(cursor):
     """Initializes all database triggers at once."""
@@ -52,10 +67,13 @@ class DatabaseManager:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
+            cls._instance._local = threading.local()
+            cls._instance._db_path = None
             cls._instance.initDB()
         return cls._instance
 
-    def getConn(self):
+    @classmethod
+    def _resolveDbPath(cls):
         if os.name == 'nt':  # Windows
             base_dir = os.getenv('APPDATA')
         else:
@@ -63,15 +81,52 @@ class DatabaseManager:
 
         app_dir = os.path.join(base_dir, "MacroStudio")
         os.makedirs(app_dir, exist_ok=True)
-        db_path = os.path.join(app_dir, self.DB_NAME)
+        return os.path.join(app_dir, cls.DB_NAME)
 
-        conn = sqlite3.connect(db_path)
-        conn.execute("PRAGMA foreign_keys = ON;")
-        conn.row_factory = sqlite3.Row
+    def getConn(self):
+        """
+        Returns this thread's connection, opening and configuring it on first use.
+        The connection is shared by every caller on the thread, so don't close it.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Room for every statement the stores run, so none get evicted and re-parsed
+            conn = sqlite3.connect(self._db_path, cached_statements=CACHED_STATEMENTS)
+            conn.execute("PRAGMA journal_mode = WAL;")
+            conn.execute("PRAGMA synchronous = NORMAL;")
+            conn.execute("PRAGMA foreign_keys = ON;")
+            # Wait out another connection's write lock instead of failing with "database is locked"
+            conn.execute("PRAGMA busy_timeout = 30000;")
+            conn.execute("PRAGMA temp_store = MEMORY;")
+            # Negative is in KiB, about 20MB of page cache
+            conn.execute("PRAGMA cache_size = -20000;")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
         return conn
 
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the block in a write transaction on this thread's connection, committing on success and rolling back on error.
+        Nested uses join the outer transaction.
+        """
+        conn = self.getConn()
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+
     def initDB(self):
         """Create tables if they don't exist."""
+        self._db_path = self._resolveDbPath()
         conn = self.getConn()
         cursor = conn.cursor()
 
@@ -88,7 +143,7 @@ class DatabaseManager:
                             CREATE TABLE IF NOT EXISTS tasks (
                                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                                 name TEXT,
-                                steps TEXT,
+                                steps BLOB,
                                 duration_ms INTEGER,
                                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                             )
@@ -118,17 +173,16 @@ class DatabaseManager:
                                  value TEXT,
                                  data_type TEXT,
                                  hint TEXT,
-                                 FOREIGN KEY(profile_id) REFERENCES profiles(id) ON DELETE CASCADE
+                                 FOREIGN KEY(profile_id) REFERENCES profiles(id) ON DELETE CASCADE,
                                  UNIQUE(profile_id, key)
                             )
                            """)
 
+            _setupIndexes(cursor)
             _setupTriggers(cursor)
 
             conn.commit()
         except Exception as e:
             print("INIT ERROR", e)
             global_logger.logError(f"Database Init Error: {e}")
-        finally:
-            conn.close()
 
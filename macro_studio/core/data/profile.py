@@ -9,7 +9,13 @@ from .database_manager import DatabaseManager
 
 from macro_studio.core.utils import generateUniqueName
 
-@dataclass
+# One fixed statement per editable column, so the SQL text (and its cached statement) is stable
+_RELATIONSHIP_UPDATES = {
+    "repeat": "UPDATE profile_tasks SET repeat = ? WHERE id = ?",
+    "is_enabled": "UPDATE profile_tasks SET is_enabled = ? WHERE id = ?",
+}
+
+@dataclass(slots=True)
 class TaskRelationship:
     id: int
     task_id: int
@@ -31,10 +37,10 @@ class Profile(QObject):
         self.tasks = TaskStore(self, parent=self)
         self.profile_names = set()
 
-        self.tasks.taskRemoved.connect(self._onTaskRemoved)
+        self.tasks.tasksRemoved.connect(self._onTasksRemoved)
 
     def _getOrCreateId(self):
-        with self.db.getConn() as conn:
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id FROM profiles WHERE name = ?", (self.name,))
             row = cursor.fetchone()
@@ -42,32 +48,30 @@ class Profile(QObject):
                 return row["id"]
             else:
                 cursor.execute("INSERT INTO profiles (name) VALUES (?)", (self.name,))
-                conn.commit()
                 return cursor.lastrowid
 
-    def _onTaskRemoved(self, deleted_model: TaskModel):
-        if deleted_model.id in self.task_relationships:
-            del self.task_relationships[deleted_model.id]
+    def _onTasksRemoved(self, deleted_models: list[TaskModel]):
+        task_relationships = self.task_relationships
+        for deleted_model in deleted_models:
+            task_relationships.pop(deleted_model.id, None)
 
     def createProfile(self, profile_name: str):
         if profile_name in self.profile_names: return False
         self.profile_names.add(profile_name)
-        with self.db.getConn() as conn:
-            try:
+        try:
+            with self.db.transaction() as conn:
                 conn.execute("INSERT INTO profiles (name) VALUES (?)", (profile_name,))
-                conn.commit()
-            except sqlite3.IntegrityError:
-                return False
+        except sqlite3.IntegrityError:
+            return False
         return True
 
     def renameProfile(self, old_name, new_name):
         if old_name not in self.profile_names or new_name in self.profile_names: return False
-        with self.db.getConn() as conn:
-            try:
+        try:
+            with self.db.transaction() as conn:
                 conn.execute("UPDATE profiles SET name = ? WHERE name = ?", (new_name, old_name))
-                conn.commit()
-            except sqlite3.IntegrityError:
-                return False
+        except sqlite3.IntegrityError:
+            return False
 
         self.profile_names.remove(old_name)
         self.profile_names.add(new_name)
@@ -77,11 +81,11 @@ class Profile(QObject):
     def deleteProfile(self, profile_name):
         if profile_name not in self.profile_names: return False
         self.profile_names.remove(profile_name)
-        with self.db.getConn() as conn:
-            try:
+        try:
+            with self.db.transaction() as conn:
                 conn.execute("DELETE FROM profiles WHERE name = ?", (profile_name,))
-            except sqlite3.IntegrityError:
-                return False
+        except sqlite3.IntegrityError:
+            return False
 
         return True
 
@@ -89,7 +93,8 @@ class Profile(QObject):
         if profile_name not in self.profile_names: return None
         new_name = generateUniqueName(self.profile_names, profile_name)
 
-        with self.db.getConn() as conn:
+        # One write transaction for the whole copy, taken up front so nothing can slip in between the statements
+        with self.db.transaction() as conn:
             cursor = conn.cursor()
 
             # Select original profile's id
@@ -113,67 +118,86 @@ class Profile(QObject):
             # Copy variables
             copyVarsToNewProfile(cursor, original_id, new_id)
 
-            conn.commit()
-
         self.profile_names.add(new_name)
 
         return new_name
 
 
     def createRelationship(self, task_id, repeat=False, enabled=True):
-        if task_id in self.task_relationships: return
-        with self.db.getConn() as conn:
-            cursor = conn.execute("""
+        self.createRelationships([(task_id, repeat, enabled)])
+
+    def createRelationships(self, items):
+        """
+        Adds several tasks to this profile in one transaction, so the whole batch costs a single commit.
+        Args:
+            items: ``(task_id, repeat, enabled)`` tuples. Tasks already in the profile are skipped.
+        """
+        with self.db.transaction() as conn:
+            created = self.insertRelationships(conn, items)
+        # Only track and announce them once they're committed
+        self.addRelationships(created)
+
+    def insertRelationships(self, conn, items) -> dict[int, TaskRelationship]:
+        """
+        Writes relationship rows inside the caller's open transaction, so they commit along with its own writes.
+        Nothing is tracked yet, pass the result to ``addRelationships`` once the transaction commits.
+        Args:
+            conn: The connection the transaction is open on.
+            items: ``(task_id, repeat, enabled)`` tuples. Tasks already in the profile are skipped.
+        """
+        created: dict[int, TaskRelationship] = {}
+        for task_id, repeat, enabled in items:
+            if task_id in self.task_relationships or task_id in created: continue
+            row = conn.execute("""
                 INSERT INTO profile_tasks (profile_id, task_id, repeat, is_enabled) 
                 VALUES(?, ?, ?, ?)
                 RETURNING id
-            """, (self.id, task_id, repeat, enabled))
-            row = cursor.fetchone()
-            relation_id = row["id"]
+            """, (self.id, task_id, repeat, enabled)).fetchone()
+            created[task_id] = TaskRelationship(row["id"], task_id, repeat, enabled)
+        return created
 
-            conn.commit()
-
-        relationship = TaskRelationship(relation_id, task_id, repeat, enabled)
-        self.task_relationships[task_id] = relationship
-        self.relationshipCreated.emit(relationship)
+    def addRelationships(self, created: dict[int, TaskRelationship]):
+        """Tracks and announces relationships from ``insertRelationships`` after they're committed."""
+        self.task_relationships.update(created)
+        for relationship in created.values():
+            self.relationshipCreated.emit(relationship)
 
     def updateRelationshipState(self, relationship: TaskRelationship, field: str, value):
         """Updates relationship state and pushes changes to the DB"""
+        query = _RELATIONSHIP_UPDATES.get(field)
+        if query is None:
+            raise ValueError(f"Relationship field '{field}' can't be updated.")
+        # UI toggles can re-send the current value, nothing to write then
+        if getattr(relationship, field) == value: return
         setattr(relationship, field, value)
 
-        with self.db.getConn() as conn:
-            query = f"UPDATE profile_tasks SET {field} = ? WHERE id = ?"
+        with self.db.transaction() as conn:
             conn.execute(query, (value, relationship.id))
-            conn.commit()
 
     def removeRelationship(self, task_id):
         if task_id in self.task_relationships:
             del self.task_relationships[task_id]
 
-            with self.db.getConn() as conn:
+            with self.db.transaction() as conn:
                 conn.execute("DELETE FROM profile_tasks WHERE task_id = ?", (task_id,))
-                conn.commit()
 
     def load(self, profile_name: str):
         is_first_load = self.name is None
         self.name = profile_name
         self.id = self._getOrCreateId()
 
-        self.task_relationships.clear()
-        with self.db.getConn() as conn:
-            rows = conn.execute("SELECT * FROM profile_tasks WHERE profile_id = ? ORDER BY created_at", (self.id,))
-            for row in rows:
-                self.task_relationships[row["task_id"]] = TaskRelationship(
-                    id=row["id"],
-                    task_id=row["task_id"],
-                    repeat=row["repeat"],
-                    is_enabled=row["is_enabled"]
-                )
-
-            if is_first_load:
-                rows = conn.execute("SELECT * FROM profiles ORDER BY updated_at")
-                for row in rows:
-                    self.profile_names.add(row["name"])
+        conn = self.db.getConn()
+        # Plain tuples in column order, so each relationship is built positionally in one pass
+        cursor = conn.execute("SELECT id, task_id, repeat, is_enabled FROM profile_tasks WHERE profile_id = ? ORDER BY created_at",
+                              (self.id,))
+        cursor.row_factory = None
+        self.task_relationships = {row[1]: TaskRelationship(*row) for row in cursor}
+
+        if is_first_load:
+            # profile_names is a set, so the old ORDER BY bought nothing
+            cursor = conn.execute("SELECT name FROM profiles")
+            cursor.row_factory = None
+            self.profile_names.update(name for name, in cursor)
 
         self.vars.load(self.id)
         if is_first_load:
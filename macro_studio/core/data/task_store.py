@@ -1,29 +1,67 @@
 import json, re
-from dataclasses import dataclass
-from datetime import datetime
-from typing import TYPE_CHECKING, Dict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, Iterable
 
 from PySide6.QtCore import Signal, QObject
 
 from macro_studio.core.registries.type_handler import GlobalTypeHandler
-from macro_studio.core.utils import FileIO, global_logger, generateUniqueName
+from macro_studio.core.utils import FileIO, global_logger, generateUniqueName, splitNameSuffix
+
+# Steps are stored as UTF-8 JSON bytes (a BLOB), older rows may still hold TEXT and both load the same
+try:
+    # C encoder/parser, steps can get large
+    import orjson
+    _loadSteps = orjson.loads
+
+    def _dumpSteps(steps: list) -> bytes:
+        return orjson.dumps(steps, default=str)
+except ImportError:
+    _loadSteps = json.loads
+
+    def _dumpSteps(steps: list) -> bytes:
+        return json.dumps(steps, default=str).encode()
 
 if TYPE_CHECKING:
     from .profile import Profile
 
+# Most IDs bound into one IN (...), old SQLite builds cap a statement at 999 parameters
+SQL_BATCH_SIZE = 500
+
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class TaskModel:
     name: str
     steps: list = None
     created_at: str | datetime = None
     duration_ms: int = 0
     id: int = None
+    # Stored steps that haven't been parsed yet, the steps slot stays empty until they're first read
+    _raw_steps: bytes | str | None = field(default=None, init=False, repr=False)
 
     def __post_init__(self):
         if self.steps is None: self.steps = []
         if self.duration_ms is None: self.duration_ms = 0
 
+    @classmethod
+    def fromRow(cls, t_id: int, name: str, raw_steps: bytes | str | None, created_at, duration_ms: int):
+        """Builds a model from a tasks row, leaving its steps to be parsed the first time they're read."""
+        task = cls(name, None, created_at, duration_ms, t_id)
+        if raw_steps:
+            task._raw_steps = raw_steps
+            del task.steps
+        return task
+
+    def __getattr__(self, name):
+        # Only reached for an empty slot, which for steps means they haven't been parsed yet
+        if name == "steps":
+            raw_steps = self._raw_steps
+            if raw_steps is not None:
+                self._raw_steps = None
+                steps = self.steps = _loadSteps(raw_steps)
+                return steps
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
     def toDict(self):
         serial = {"name": self.name}
         GlobalTypeHandler.setIfEvals("steps", self.steps, serial)
@@ -31,48 +69,53 @@ class TaskModel:
         GlobalTypeHandler.setIfEvals("duration_ms", self.duration_ms, serial)
         return serial
 
-    def dumpSteps(self) -> str | None:
-        if not self.steps: return None
-        return json.dumps(self.steps, default=str)
+    def setSerializedSteps(self, raw_steps: bytes | str):
+        """Replaces the steps with already serialized ones, they're only parsed if something reads them."""
+        if not raw_steps:
+            self.steps = []
+            return
+        self._raw_steps = raw_steps
+        try:
+            del self.steps
+        except AttributeError:
+            pass  # Never parsed the previous ones either
+
+    def dumpSteps(self) -> bytes | str | None:
+        try:
+            # Skips __getattr__, so unparsed steps aren't parsed just to be serialized again
+            steps = object.__getattribute__(self, "steps")
+        except AttributeError:
+            return self._raw_steps
+        if not steps: return None
+        return _dumpSteps(steps)
 
 
 class TaskStore(QObject):
     """Tasks are globalized, available for all profiles"""
     activeStepSet = Signal()
     taskAdded = Signal(TaskModel)
-    taskRemoved = Signal(TaskModel)  # (removed task)
+    tasksAdded = Signal(list)  # (added tasks) Emitted once per createTasks batch
+    taskRemoved = Signal(TaskModel)  # (removed task) Emitted by popTask, after tasksRemoved
+    tasksRemoved = Signal(list)  # (removed tasks) Emitted once per popTasks batch
     taskSaved = Signal(TaskModel)
     taskRenamed = Signal(str, TaskModel)  # (old name, model with new name)
+    tasksRenamed = Signal(list)  # [(old name, model with new name)] Emitted once per renameTasks batch, before taskRenamed
 
     def __init__(self, profile: "Profile", parent=None):
         super().__init__(parent)
         self.profile = profile
         self.db = profile.db
         self.tasks: Dict[int, TaskModel] = {}
+        # Kept in step with self.tasks so name lookups and uniqueness checks are a hash lookup
+        self._tasks_by_name: Dict[str, TaskModel] = {}
+        # Core name -> lowest suffix that might still be free, so repeated copies don't re-probe the taken ones
+        self._name_counters: Dict[str, int] = {}
         self._active_id: int | None = None
 
     def createTask(self, name_or_model: str | TaskModel, set_as_active=False):
         """Creates a new task, saves to DB to get ID, then adds to store."""
         new_task = TaskModel(name=name_or_model) if isinstance(name_or_model, str) else name_or_model
-
-        steps_json = new_task.dumpSteps()
-
-        # Insert into DB first to generate the ID
-        with self.db.getConn() as conn:
-            cursor = conn.execute("""
-                                  INSERT INTO tasks (name, steps)
-                                  VALUES (?, ?)
-                                  RETURNING id, created_at
-                                  """, (new_task.name, steps_json))
-
-            row = cursor.fetchone()
-            new_task.created_at = row["created_at"]
-            new_task.id = row["id"]
-
-            conn.commit()
-
-        self.tasks[new_task.id] = new_task
-        self.profile.createRelationship(new_task.id)
+        self._insertTasks([new_task])
 
         if set_as_active:
             self.setActiveId(new_task.id)
@@ -81,73 +124,152 @@ class TaskStore(QObject):
 
         return new_task
 
+    def createTasks(self, models: list[TaskModel]):
+        """
+        Creates several tasks in one transaction and adds them all to the profile.
+        Announces them with a single ``tasksAdded`` instead of a ``taskAdded`` per task.
+        Taken names, including ones repeated within the batch, get a unique suffix.
+        """
+        if not models: return models
+        self._insertTasks(models, unique_names=True)
+        self.tasksAdded.emit(models)
+        return models
+
+    def _insertTasks(self, models: list[TaskModel], unique_names=False):
+        """Saves and tracks the models, filling in their IDs, then adds them to the profile."""
+        tasks_by_name = self._tasks_by_name
+        for task in models:
+            if unique_names:
+                # Named and indexed one by one so each sees the names taken before it
+                task.name = self.generateUniqueName(task.name)
+            # A repeated name keeps answering to the task that had it first, like on load
+            tasks_by_name.setdefault(task.name, task)
+
+        # Stamped here in CURRENT_TIMESTAMP's format, so the IDs come from lastrowid without reading a row back
+        created_at = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            # Insert into DB first to generate the IDs
+            with self.db.transaction() as conn:
+                cursor = conn.cursor()
+                for task in models:
+                    cursor.execute("""
+                                   INSERT INTO tasks (name, steps, duration_ms, created_at)
+                                   VALUES (?, ?, ?, ?)
+                                   """, (task.name, task.dumpSteps(), task.duration_ms, created_at))
+                    task.created_at = created_at
+                    task.id = cursor.lastrowid
+                # Same transaction, so a failure can't leave tasks that no profile holds
+                relationships = self.profile.insertRelationships(conn, [(task.id, False, True) for task in models])
+        except BaseException:
+            # Nothing was saved, give the names back
+            for task in models:
+                self._unindexName(task)
+            raise
+
+        tasks = self.tasks
+        for task in models:
+            tasks[task.id] = task
+        self.profile.addRelationships(relationships)
+
     def popTask(self, task_id: int = None):
         """Removes a task by ID."""
         if task_id is None:
             task_id = self._active_id
 
-        if task_id is None or task_id not in self.tasks:
-            return None
-
+        removed = self.popTasks((task_id,)) if task_id is not None else None
+        if not removed: return None
+        self.taskRemoved.emit(removed[0])
+        return removed[0]
+
+    def popTasks(self, task_ids: Iterable[int]):
+        """
+        Removes several tasks by ID, deleting them all in one transaction. Unknown IDs are skipped.
+        Returns:
+            The removed tasks.
+        """
         # Remove from Dict
-        task = self.tasks.pop(task_id)
+        tasks = self.tasks
+        removed = [task for task in (tasks.pop(task_id, None) for task_id in task_ids) if task is not None]
+        if not removed: return removed
+        for task in removed:
+            self._unindexName(task)
 
-        # Remove from DB
-        with self.db.getConn() as conn:
-            conn.execute("DELETE FROM tasks WHERE id = ? AND name = ?",
-                         (task.id, task.name))
-            conn.commit()
+        # Remove from DB, chunked to stay under SQLite's bound parameter limit
+        with self.db.transaction() as conn:
+            for start in range(0, len(removed), SQL_BATCH_SIZE):
+                ids = [task.id for task in removed[start:start + SQL_BATCH_SIZE]]
+                conn.execute(f"DELETE FROM tasks WHERE id IN ({','.join('?' * len(ids))})", ids)
 
-        self.taskRemoved.emit(task)
+        self.tasksRemoved.emit(removed)
 
         # Handle Active ID switching
         if not self.tasks:
             # No tasks left
             self.setActiveId(-1)
-        elif task_id == self._active_id:
+        elif any(task.id == self._active_id for task in removed):
             # We deleted the active task, select some other task
             self.setActiveId(next(iter(self.tasks), -1))
 
-        return task
+        return removed
 
     def updateTaskName(self, task, new_name):
-        old_name = task.name
-        if old_name != new_name:
+        self.renameTasks(((task, new_name),))
+
+    def renameTasks(self, renames: Iterable[tuple[TaskModel, str]]):
+        """
+        Renames several tasks, writing them all in one transaction. Names should already be validated.
+        Args:
+            renames: ``(task, new name)`` pairs, unchanged names are skipped.
+        """
+        renamed = [(task, task.name, new_name) for task, new_name in renames if task.name != new_name]
+        if not renamed: return
+
+        # Free every old name before taking the new ones, so tasks can swap names within a batch
+        for task, _, _ in renamed:
+            self._unindexName(task)
+        for task, _, new_name in renamed:
             task.name = new_name
-            with self.db.getConn() as conn:
-                conn.execute("UPDATE tasks SET name = ? WHERE id = ? AND name = ?",
-                             (new_name, task.id, old_name))
-                conn.commit()
+            self._tasks_by_name[new_name] = task
+
+        with self.db.transaction() as conn:
+            conn.executemany("UPDATE tasks SET name = ? WHERE id = ?",
+                             [(new_name, task.id) for task, _, new_name in renamed])
+
+        self.tasksRenamed.emit([(old_name, task) for task, old_name, _ in renamed])
+        for task, old_name, _ in renamed:
             self.taskRenamed.emit(old_name, task)
 
     def _silentCreateTask(self, task):
         new_task = self.createTask(task, set_as_active=False)
         self._active_id = new_task.id
 
-    def saveStepsToActive(self, json_steps, duration_ms):
+    def saveStepsToActive(self, steps: list | bytes | str, duration_ms):
+        """
+        Saves steps to the active task, creating one for them if there's none.
+        Args:
+            steps: The step list, or steps already serialized to JSON, which are written as given.
+            duration_ms: The total duration of the steps.
+        """
         task = self.getActiveTask()
-        if task:
-            task.steps = json_steps
+        is_new = task is None
+        if is_new:
+            task = TaskModel(name="New Task", duration_ms=duration_ms)
         else:
-            task = TaskModel(name="New Task", steps=json_steps, duration_ms=duration_ms)
-            # This will create DB entry and set active ID
-            self._silentCreateTask(task)
-            # Re-fetch active because _silentCreateTask might have changed it
-            task = self.getActiveTask()
-
-        steps_json = task.dumpSteps()
-        with self.db.getConn() as conn:
-            cursor = conn.execute("""
-                                  UPDATE tasks SET steps = ?, duration_ms = ? WHERE id= ? AND name = ?
-                                  RETURNING id, created_at
-                                  """, (steps_json, duration_ms, task.id, task.name))
+            task.duration_ms = duration_ms
 
-            # Update timestamps if needed
-            row = cursor.fetchone()
-            if row:
-                task.created_at = row["created_at"]
+        if isinstance(steps, (bytes, str)):
+            task.setSerializedSteps(steps)
+        else:
+            task.steps = steps
 
-            conn.commit()
+        if is_new:
+            # This will create DB entry, steps included, and set active ID
+            self._silentCreateTask(task)
+        else:
+            # created_at never changes on an update, so there's nothing to read back
+            with self.db.transaction() as conn:
+                conn.execute("UPDATE tasks SET steps = ?, duration_ms = ? WHERE id = ?",
+                             (task.dumpSteps(), duration_ms, task.id))
 
         self.taskSaved.emit(task)
 
@@ -194,10 +316,15 @@ class TaskStore(QObject):
         return self._active_id
 
     def getTaskByName(self, task_name: str):
-        for task in self.tasks.values():
-            if task.name == task_name:
-                return task
-        return None
+        return self._tasks_by_name.get(task_name)
+
+    def _unindexName(self, task: TaskModel):
+        if self._tasks_by_name.get(task.name) is task:
+            del self._tasks_by_name[task.name]
+            # The freed suffix can be handed out again
+            core_name, suffix = splitNameSuffix(task.name)
+            if suffix is not None and suffix < self._name_counters.get(core_name, 1):
+                self._name_counters[core_name] = suffix
 
     def validateRename(self, new_name, current_name):
         clean_name = new_name.strip()
@@ -214,48 +341,63 @@ class TaskStore(QObject):
         return True, clean_name
 
     def generateUniqueName(self, base_name):
-        return generateUniqueName(self.tasks.values(), base_name)
+        core_name = splitNameSuffix(base_name)[0]
+        unique_name = generateUniqueName(self._tasks_by_name, base_name, self._name_counters.get(core_name, 1))
+        if unique_name != base_name:
+            # Everything up to the suffix we just handed out is taken now
+            self._name_counters[core_name] = splitNameSuffix(unique_name)[1] + 1
+        return unique_name
 
     def exportActiveTask(self, filepath):
         active_task = self.getActiveTask()
         return FileIO.exportData(active_task.toDict(), filepath) if active_task else False
 
     def importTask(self, filepath):
-        data = FileIO.importData(filepath)
-        if not data: return False
-        original_name = data.get("name", "Imported Task")
-        safe_name = self.generateUniqueName(original_name)
-        data["name"] = safe_name
-
-        task_model = TaskModel(**data)
-        self.createTask(task_model)
-
-        global_logger.log(f"Imported task '{original_name}' as '{safe_name}'.")
-
-        return True
+        return self.importTasks((filepath,)) == 1
+
+    def importTasks(self, filepaths: Iterable[str]):
+        """
+        Imports several exported task files, creating them all in one transaction. Unreadable files are skipped.
+        Returns:
+            How many tasks were imported.
+        """
+        models = []
+        original_names = []
+        for filepath in filepaths:
+            data = FileIO.importData(filepath)
+            if not data: continue
+            original_names.append(data.setdefault("name", "Imported Task"))
+            models.append(TaskModel(**data))
+
+        # Unique names are handed out while creating, so files sharing a name don't collide with each other
+        self.createTasks(models)
+
+        for original_name, task_model in zip(original_names, models):
+            global_logger.log(f"Imported task '{original_name}' as '{task_model.name}'.")
+
+        return len(models)
 
     def initialLoad(self):
         self.tasks.clear()
+        self._tasks_by_name.clear()
+        self._name_counters.clear()
         self._active_id = None
 
-        with self.db.getConn() as conn:
-            # We still order by created_at to maintain a logical list order
-            rows = conn.execute("SELECT * FROM tasks ORDER BY created_at")
-            first_id = None
-
-            for row in rows:
-                t_id = row["id"]
-                if first_id is None:
-                    first_id = t_id
-
-                j_steps = row["steps"]
-                self.tasks[t_id] = TaskModel(
-                    name=row["name"],
-                    steps=json.loads(j_steps) if j_steps else None,
-                    created_at=row["created_at"],
-                    duration_ms=row["duration_ms"],
-                    id=t_id
-                )
+        conn = self.db.getConn()
+        # We still order by created_at to maintain a logical list order.
+        # Steps stay serialized until read, so only the tasks that get opened or run pay for parsing them
+        cursor = conn.execute("SELECT id, name, steps, created_at, duration_ms FROM tasks ORDER BY created_at")
+        cursor.row_factory = None
+        rows = cursor.fetchall()
+        first_id = rows[0][0] if rows else None
+
+        tasks = self.tasks
+        tasks_by_name = self._tasks_by_name
+        from_row = TaskModel.fromRow
+        for row in rows:
+            task = tasks[row[0]] = from_row(*row)
+            # Older databases can hold repeated names, the first one keeps answering to it like before
+            tasks_by_name.setdefault(task.name, task)
 
         if self.tasks and first_id is not None:
             self.setActiveId(first_id)
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Hashable
+from typing import TYPE_CHECKING, Hashable, Iterable
 from PySide6.QtCore import Signal, QObject
 
 from .variable_config import VariableConfig
@@ -8,6 +8,13 @@ from macro_studio.core.registries.capture_type_registry import GlobalCaptureRegi
 if TYPE_CHECKING:
     from .database_manager import DatabaseManager
 
+_UPSERT_SQL = """
+              INSERT INTO variables (profile_id, key, value, data_type, hint)
+              VALUES (?, ?, ?, ?, ?)
+              ON CONFLICT(profile_id, key) DO UPDATE SET value=excluded.value,
+                                                         data_type=excluded.data_type,
+                                                         hint=excluded.hint
+              """
 
 def copyVarsToNewProfile(cursor, old_profile_id, new_profile_id):
     cursor.execute("""
@@ -41,40 +48,63 @@ class VariableStore(QObject):
             default_val: The default value of this variable.
             pick_hint: The hint to display while the variable is being picked or hovered over
         """
+        self.bulkAdd(((key, data_type, default_val, pick_hint),))
+
+    def bulkAdd(self, entries: Iterable[tuple]):
+        """
+        Adds several variables like ``add``, but upserts them all in one transaction.
+        Signals are emitted once everything is committed.
+        Args:
+            entries: ``(key, data_type, default_val, pick_hint)`` tuples, the last two can be left off.
+        """
+        # (key string, config, is new) for every entry that needs writing, in call order
+        pending = []
+        for entry in entries:
+            result = self._applyAdd(*entry)
+            if result is not None: pending.append(result)
+        if not pending: return
+
+        with self.db.transaction() as conn:
+            conn.executemany(_UPSERT_SQL, [self._upsertParams(key_str, config) for key_str, config, _ in pending])
+
+        for key_str, config, is_new in pending:
+            if is_new:
+                self.varAdded.emit(key_str, config)
+            else:
+                self.varChanged.emit(key_str)
+
+    def _applyAdd(self, key: Hashable, data_type: CaptureMode | type, default_val: object=None, pick_hint: str=None):
+        """Applies an add in memory. Returns ``(key string, config, is new)`` if it has to be written, else None."""
         key_str = VariableConfig.keyToStr(key)
         if key_str not in self:
             config = VariableConfig(data_type, default_val, pick_hint)
             self._vars[key_str] = config
-            self._sql_upsert(key_str, config)
-            self.varAdded.emit(key_str, config)
-        else:
-            config = self[key_str]
-            has_changes = False
-            if config.hint != pick_hint and pick_hint is not None:
-                config.hint = pick_hint
-                has_changes = True
-
-            data_type = GlobalCaptureRegistry.get(data_type).type_class if GlobalCaptureRegistry.containsMode(data_type) else data_type
-
-            # If value types differ, or there's no value for config, overwrite the previous value and value type
-            if (data_type is not config.data_type) or (config.value is None and default_val != config.value):
-                has_changes = True
-                config.data_type = data_type
-                config.value = default_val
-
-            if has_changes:
-                self._sql_upsert(key_str, config)
-                self.varChanged.emit(key_str)
+            return key_str, config, True
+
+        config = self[key_str]
+        has_changes = False
+        if config.hint != pick_hint and pick_hint is not None:
+            config.hint = pick_hint
+            has_changes = True
+
+        data_type = GlobalCaptureRegistry.get(data_type).type_class if GlobalCaptureRegistry.containsMode(data_type) else data_type
+
+        # If value types differ, or there's no value for config, overwrite the previous value and value type
+        if (data_type is not config.data_type) or (config.value is None and default_val != config.value):
+            has_changes = True
+            config.data_type = data_type
+            config.value = default_val
+
+        return (key_str, config, False) if has_changes else None
 
     def remove(self, key: Hashable) -> VariableConfig | None:
         """Attempts to remove the key from the store. If the key is not present, returns None."""
         key_str = VariableConfig.keyToStr(key)
         if key_str in self:
             config = self._vars.pop(key_str)
-            with self.db.getConn() as conn:
+            with self.db.transaction() as conn:
                 conn.execute("DELETE FROM variables WHERE profile_id = ? AND key = ?",
                              (self._profile_id, key_str))
-                conn.commit()
 
             self.varRemoved.emit(key_str, config)
             return config
@@ -95,28 +125,21 @@ class VariableStore(QObject):
 
         if not key_str in self: raise KeyError(f"Could not find key '{key_str}' in store.")
         config = self._vars[key_str]
+        # Re-confirming the same value (e.g. an unchanged edit committed on focus-out) is a no-op
+        old_value = config.value
+        if type(new_value) is type(old_value) and new_value == old_value:
+            return
+
         config.value = new_value
         val_str = config.valToStr()
-        with self.db.getConn() as conn:
+        with self.db.transaction() as conn:
             conn.execute("UPDATE variables SET value = ? WHERE profile_id = ? AND key = ?",
                          (val_str, self._profile_id, key_str))
-            conn.commit()
 
         self.varChanged.emit(key_str)
 
-    def _sql_upsert(self, key, config):
-        """Helper to insert or replace a record."""
-        type_str = config.data_type.__name__
-        val_str = config.valToStr()
-        with self.db.getConn() as conn:
-            conn.execute("""
-                         INSERT INTO variables (profile_id, key, value, data_type, hint)
-                         VALUES (?, ?, ?, ?, ?)
-                         ON CONFLICT(profile_id, key) DO UPDATE SET value=excluded.value,
-                                                                    data_type=excluded.data_type,
-                                                                    hint=excluded.hint
-                         """, (self._profile_id, key, val_str, type_str, config.hint))
-            conn.commit()
+    def _upsertParams(self, key, config):
+        return self._profile_id, key, config.valToStr(), config.data_type.__name__, config.hint
 
     def get(self, key: Hashable) -> VariableConfig | None:
         return self._vars.get(VariableConfig.keyToStr(key))
@@ -133,11 +156,12 @@ class VariableStore(QObject):
     def load(self, profile_id: int):
         self._profile_id = profile_id
         self._vars.clear()
-        with self.db.getConn() as conn:
-            rows = conn.execute("SELECT * FROM variables WHERE profile_id = ?", (profile_id,))
-            for row in rows:
-                config = VariableConfig.fromRow(row)
-                self._vars[row["key"]] = config
+        rows = self.db.getConn().execute("SELECT * FROM variables WHERE profile_id = ?", (profile_id,))
+        # Bind once for the row loop, large profiles hit these per variable
+        from_row = VariableConfig.fromRow
+        loaded_vars = self._vars
+        for row in rows:
+            loaded_vars[row["key"]] = from_row(row)
 
     def __contains__(self, item):
         return item in self._vars
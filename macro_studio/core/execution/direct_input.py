@@ -0,0 +1,166 @@
+import ctypes
+import pydirectinput
+from ctypes import byref, sizeof
+from pydirectinput import (KEYBOARD_MAPPING, MOUSE_LEFT, MOUSE_MIDDLE, MOUSE_RIGHT, MOUSE_PRIMARY, MOUSE_SECONDARY,
+                           MOUSE_BUTTON4, MOUSE_X1, MOUSE_BUTTON5, MOUSE_X2)
+
+# winuser.h values
+_INPUT_MOUSE = 0
+_INPUT_KEYBOARD = 1
+_KEYEVENTF_EXTENDEDKEY = 0x0001
+_KEYEVENTF_KEYUP = 0x0002
+_KEYEVENTF_SCANCODE = 0x0008
+_XBUTTON1 = 0x0001
+_XBUTTON2 = 0x0002
+_SM_SWAPBUTTON = 23
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", ctypes.c_int32), ("dy", ctypes.c_int32), ("mouseData", ctypes.c_uint32),
+                ("dwFlags", ctypes.c_uint32), ("time", ctypes.c_uint32), ("dwExtraInfo", ctypes.c_size_t)]
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [("wVk", ctypes.c_uint16), ("wScan", ctypes.c_uint16), ("dwFlags", ctypes.c_uint32),
+                ("time", ctypes.c_uint32), ("dwExtraInfo", ctypes.c_size_t)]
+
+
+class _HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [("uMsg", ctypes.c_uint32), ("wParamL", ctypes.c_uint16), ("wParamH", ctypes.c_uint16)]
+
+
+class _INPUT_UNION(ctypes.Union):
+    # The hardware member is never sent, it's only here so the union has SendInput's size
+    _fields_ = [("mi", _MOUSEINPUT), ("ki", _KEYBDINPUT), ("hi", _HARDWAREINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _anonymous_ = ("ii",)
+    _fields_ = [("type", ctypes.c_uint32), ("ii", _INPUT_UNION)]
+
+
+_INPUT_SIZE = sizeof(_INPUT)
+
+try:
+    _user32 = ctypes.WinDLL("user32")
+    _SendInput = _user32.SendInput
+    _SendInput.argtypes = (ctypes.c_uint, ctypes.POINTER(_INPUT), ctypes.c_int)
+    _SendInput.restype = ctypes.c_uint
+    _GetSystemMetrics = _user32.GetSystemMetrics
+except (AttributeError, OSError):
+    # Not on Windows, always go through the public pydirectinput API
+    _SendInput = None
+
+
+def _keyboardInput(scancode: int, flags: int):
+    return _INPUT(_INPUT_KEYBOARD, _INPUT_UNION(ki=_KEYBDINPUT(wScan=scancode, dwFlags=flags)))
+
+
+def _mouseInput(flags: int, mouse_data: int=0):
+    return _INPUT(_INPUT_MOUSE, _INPUT_UNION(mi=_MOUSEINPUT(mouseData=mouse_data, dwFlags=flags)))
+
+
+def _buttonInputs(down_flag: int, up_flag: int, mouse_data: int=0):
+    return _mouseInput(down_flag, mouse_data), _mouseInput(up_flag, mouse_data)
+
+
+# button name -> (down INPUT, up INPUT). Button presses carry no position, so each one is built once up front
+_button_inputs = {
+    MOUSE_LEFT: _buttonInputs(0x0002, 0x0004),
+    MOUSE_RIGHT: _buttonInputs(0x0008, 0x0010),
+    MOUSE_MIDDLE: _buttonInputs(0x0020, 0x0040),
+}
+_button_inputs[MOUSE_BUTTON4] = _button_inputs[MOUSE_X1] = _buttonInputs(0x0080, 0x0100, _XBUTTON1)
+_button_inputs[MOUSE_BUTTON5] = _button_inputs[MOUSE_X2] = _buttonInputs(0x0080, 0x0100, _XBUTTON2)
+
+# key name -> (down INPUT, up INPUT), or None if the key has to go through pydirectinput
+_key_inputs = {}
+
+
+def _buildKeyInputs(key_name: str):
+    scancode = KEYBOARD_MAPPING.get(key_name)
+    # Multi-scancode keys are rare, leave them to pydirectinput
+    if not isinstance(scancode, int):
+        return None
+
+    scancode &= 0xFFFF
+    flags = _KEYEVENTF_SCANCODE | (_KEYEVENTF_EXTENDEDKEY if scancode >= 0xE000 else 0)
+    return _keyboardInput(scancode, flags), _keyboardInput(scancode, flags | _KEYEVENTF_KEYUP)
+
+
+def _getKeyInputs(key_name: str):
+    try:
+        return _key_inputs[key_name]
+    except KeyError:
+        inputs = _key_inputs[key_name] = _buildKeyInputs(key_name)
+        return inputs
+
+
+def _failSafeCheck():
+    # Same check pydirectinput runs before its own input, read at call time so toggling it still applies
+    if pydirectinput.FAILSAFE and tuple(pydirectinput.position()) in pydirectinput.FAILSAFE_POINTS:
+        raise pydirectinput.FailSafeException(
+            "Fail-safe triggered from mouse moving to a corner of the screen. "
+            "To disable this fail-safe, set pydirectinput.FAILSAFE to False.")
+
+
+def _sendInput(input_struct):
+    _failSafeCheck()
+    return _SendInput(1, byref(input_struct), _INPUT_SIZE) == 1
+
+
+def keyDown(key_name: str):
+    """Presses the key by sending its cached scancode INPUT, falling back to pydirectinput for unknown keys."""
+    inputs = _getKeyInputs(key_name) if _SendInput else None
+    if inputs is None:
+        return pydirectinput.keyDown(key_name)
+    return _sendInput(inputs[0])
+
+
+def keyUp(key_name: str):
+    """Releases the key by sending its cached scancode INPUT, falling back to pydirectinput for unknown keys."""
+    inputs = _getKeyInputs(key_name) if _SendInput else None
+    if inputs is None:
+        return pydirectinput.keyUp(key_name)
+    return _sendInput(inputs[1])
+
+
+def _getButtonInputs(button: str):
+    if button == MOUSE_PRIMARY or button == MOUSE_SECONDARY:
+        # The swap setting can change while we run, so it's looked up per press
+        is_left = (button == MOUSE_PRIMARY) != (_GetSystemMetrics(_SM_SWAPBUTTON) != 0)
+        button = MOUSE_LEFT if is_left else MOUSE_RIGHT
+    inputs = _button_inputs.get(button)
+    if inputs is None:
+        raise ValueError(f"Invalid mouse button '{button}'")
+    return inputs
+
+
+def mouseDown(x: int=None, y: int=None, button: str=MOUSE_PRIMARY, **move_kwargs):
+    """
+    Presses the mouse button by sending its cached INPUT.
+    Args:
+        x: X coordinate to move to first, if given. Moves go through pydirectinput, which maps the position
+            against the current screen.
+        y: Y coordinate to move to first, if given.
+        button: The pydirectinput button name.
+        move_kwargs: Passed on to ``pydirectinput.moveTo``.
+    """
+    if not _SendInput:
+        return pydirectinput.mouseDown(x, y, button, **move_kwargs)
+
+    inputs = _getButtonInputs(button)
+    if x is not None or y is not None:
+        pydirectinput.moveTo(x, y, _pause=False, **move_kwargs)
+    return _sendInput(inputs[0])
+
+
+def mouseUp(x: int=None, y: int=None, button: str=MOUSE_PRIMARY, **move_kwargs):
+    """Releases the mouse button by sending its cached INPUT, takes the same arguments as ``mouseDown``."""
+    if not _SendInput:
+        return pydirectinput.mouseUp(x, y, button, **move_kwargs)
+
+    inputs = _getButtonInputs(button)
+    if x is not None or y is not None:
+        pydirectinput.moveTo(x, y, _pause=False, **move_kwargs)
+    return _sendInput(inputs[1])
@@ -14,6 +14,8 @@ class MacroStudio:
     def __init__(self, macro_name: str=None):
         self._profile = Profile()
         self._manager = TaskManager(self, self._profile)
+        # Whether the stop still waiting on the worker came from the macro finishing
+        self._stop_completed = False
 
         # Setup UI stuff
         self.ui = MainWindow(self._manager, self._profile)
@@ -25,6 +27,7 @@ class MacroStudio:
         self.ui.pause_signal.connect(self.pauseExecution)
         self.ui.stop_signal.connect(self.cancelExecution)
         self._manager.finished_signal.connect(lambda: self.cancelExecution(True))
+        self._manager.halted_signal.connect(self._onWorkerHalted)
 
         self._profile.load(macro_name or "Default")
 
@@ -104,8 +107,10 @@ class MacroStudio:
                 self.resumeExecution()
             return
 
+        if not self._manager.startWorker():
+            global_logger.log("Cannot start: The previous run is still stopping.", level=LogLevel.WARN)
+            return
         self.ui.startMacroVisuals()
-        self._manager.startWorker()
 
     @property
     def loop_delay(self):
@@ -132,9 +137,36 @@ class MacroStudio:
         self.ui.startMacroVisuals()
         success = self._manager.stopWorker()
         if success:
-            global_logger.log("Globally Cancelled Execution" if not completed else "Macro Finished. All tasks completed.")
+            self._showStopped(completed)
+        else:
+            # Shown once the worker halts
+            self._stop_completed = completed
+
+    def _showStopped(self, completed=False):
+        global_logger.log("Globally Cancelled Execution" if not completed else "Macro Finished. All tasks completed.")
+        self.ui.stopMacroVisuals()
+
+    def _showPaused(self, interrupt: bool):
+        if self.isRunningTasks():
+            self.ui.pauseMacroVisuals(interrupt)
+            if interrupt:
+                global_logger.log(
+                    "Global Interrupt Active: Running tasks interrupted and cleaned up. (Current wait timers cancelled).")
+            else:
+                global_logger.log("Global Pause Active")
+        else:
+            # Interrupt killed running tasks
             self.ui.stopMacroVisuals()
 
+    def _onWorkerHalted(self, is_pause: bool):
+        # A stop or pause the worker took a while to honor has gone through
+        if is_pause:
+            self._showPaused(self._manager.worker.isInterrupted())
+        else:
+            completed = self._stop_completed
+            self._stop_completed = False
+            self._showStopped(completed)
+
     def pauseExecution(self, interrupt: bool=False):
         """
         Pauses the currently running task.
@@ -148,7 +180,7 @@ class MacroStudio:
                 * ``False``: **Freeze.** Suspends the generator execution at the exact current line.
                   No cleanup logic is triggered; held keys remain held and local variables are preserved exactly as-is.
         Returns:
-            ``True`` if the pause command was issued successfully; ``False`` if the engine could not be stopped.
+            ``True`` if the pause command was issued successfully; ``False`` if the engine could not be stopped right away.
         """
         if not self.isRunningTasks():
             global_logger.log("Cannot pause: Worker is already stopped.", level=LogLevel.WARN)
@@ -158,16 +190,7 @@ class MacroStudio:
         self.ui.resumeMacroVisuals()
         success = self._manager.pauseWorker(interrupt)
         if success:
-            if self.isRunningTasks():
-                self.ui.pauseMacroVisuals(interrupt)
-                if interrupt:
-                    global_logger.log(
-                        "Global Interrupt Active: Running tasks interrupted and cleaned up. (Current wait timers cancelled).")
-                else:
-                    global_logger.log("Global Pause Active")
-            else:
-                # Interrupt killed running tasks
-                self.ui.stopMacroVisuals()
+            self._showPaused(interrupt)
 
         return success
 
@@ -6,6 +6,7 @@ from macro_studio.core.types_and_enums import TaskInterruptedException
 from macro_studio.core.recording.input_translator import DirectInputTranslator
 from macro_studio.core.recording.timeline_handler import ActionType, TimelineStep, M_FUNCTION_TO_PYDIRECTINPUT
 from macro_studio.actions import taskSleep, taskWaitForResume, taskPasteText
+from . import direct_input
 
 if TYPE_CHECKING:
     from macro_studio.core.data import VariableStore, TaskModel
@@ -63,17 +64,17 @@ class ManualTaskWrapper:
             if isinstance(m_btn, int):
                 pydirectinput.scroll(clicks=120 * m_btn, x=x, y=y)
             else:
-                pydirectinput.mouseDown(x=x, y=y, button=m_btn)
+                direct_input.mouseDown(x=x, y=y, button=m_btn)
         else:
-            pydirectinput.keyDown(step_value)
+            direct_input.keyDown(step_value)
 
     def _releaseKeyOrBtn(self, step_value):
         if isinstance(step_value, tuple):
             m_btn, m_pos = step_value
             x, y = self._getMousePos(m_pos)
-            pydirectinput.mouseUp(x=x, y=y, button=m_btn, duration=0.001)
+            direct_input.mouseUp(x=x, y=y, button=m_btn, duration=0.001)
         else:
-            pydirectinput.keyUp(step_value)
+            direct_input.keyUp(step_value)
 
     def _addToSoloOrPending(self, step, solo, pending):
         if step.partner_idx is None:
@@ -118,17 +119,31 @@ class ManualTaskWrapper:
 
     def runTask(self):
         try:
+            # Steps ran since we last handed control back to the worker
+            steps_since_yield = 0
             while self.step_idx < len(self.steps):
                 step = self.steps[self.step_idx]
                 self.step_idx += 1
 
                 if step.action_type == ActionType.DELAY:
                     delay_time = step.value or 0
-                    yield from taskSleep(delay_time)
+                    # Zero delays would only cost a scheduler round trip, so skip them
+                    if delay_time > 0:
+                        steps_since_yield = 0
+                        yield from taskSleep(delay_time)
+                        continue
                 elif step.action_type == ActionType.TEXT:
+                    steps_since_yield = 0
                     yield from taskPasteText(step.value)
+                    continue
                 else:
                     self._processStep(step)
+
+                # Still yield every so often so long runs of instant steps can't starve the other tasks
+                steps_since_yield += 1
+                if steps_since_yield >= FORCE_YIELD_AT:
+                    steps_since_yield = 0
+                    yield from taskSleep(0)
         except TaskInterruptedException:
             self._releasePendingInputs()
             yield from taskWaitForResume()
@@ -1,15 +1,27 @@
-import time, heapq
+import time, heapq, threading
+from collections import deque
 from PySide6.QtCore import QThread, QMutex, QMutexLocker, Signal
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Iterable
 
-from macro_studio.core.types_and_enums import LogLevel, WorkerState
+from macro_studio.core.types_and_enums import LogLevel, WorkerState, TaskInterruptedException
 from macro_studio.core.utils import global_logger
-from macro_studio.core.controllers.task_controller import TaskController, TaskState
+from macro_studio.core.controllers.task_controller import TaskController, TaskState, NS_PER_SECOND, STALE_STEP
 
 if TYPE_CHECKING:
     from macro_studio.core.execution.engine import MacroStudio
 
 
+# Bit flags mirroring WorkerState, so the per-tick state predicates are a single int test
+_ALIVE_FLAG = 1
+_PAUSED_FLAG = 2
+_INTERRUPTED_FLAG = 4
+_STATE_FLAGS = {
+    WorkerState.IDLE: 0,
+    WorkerState.RUNNING: _ALIVE_FLAG,
+    WorkerState.PAUSED: _ALIVE_FLAG | _PAUSED_FLAG,
+    WorkerState.INTERRUPTED: _ALIVE_FLAG | _PAUSED_FLAG | _INTERRUPTED_FLAG,
+}
+
 def _handleTasksOnHard(controller: "TaskController", notified_tasks: set):
     """
     Handles any tasks that have not been notified of a hard pause yet.
@@ -28,7 +40,8 @@ class TaskWorker(QThread):
 
     def __init__(self, engine: "MacroStudio", loop_delay: float):
         super().__init__()
-        self.state = WorkerState.IDLE
+        self._state = WorkerState.IDLE
+        self._state_flags = 0
         self.engine = engine
         self.loop_delay = loop_delay
         self.last_heartbeat = 0
@@ -36,16 +49,46 @@ class TaskWorker(QThread):
         self._mutex = QMutex()
         self._task_heap = []
         self._paused_tasks: set[TaskController] = set()
-        self._pause_timestamp = 0.0
-
-    def _unsafePushController(self, controller: TaskController, wake_time, cid, generation):
+        self._pause_timestamp = 0
+        # Reschedule requests from other threads, drained by the run loop in one pass per tick.
+        # deque append/popleft are atomic, so producers don't need the worker mutex.
+        self._pending: deque[tuple[TaskController, tuple]] = deque()
+        # Set when a request is queued, so the run loop's idle wait ends early instead of sleeping it out
+        self._pending_signal = threading.Event()
+        self._thread_ident: int | None = None
+
+    def _unsafePushController(self, controller: TaskController, wake_time, sort_id):
         """
         Pushes a controller to the task heap. Assumes we're locked already and the worker is active.
         If wake_time is None, replaces the remaining variables.
         """
-        heapq.heappush(self._task_heap, (wake_time, cid, generation, controller))
+        heapq.heappush(self._task_heap, (wake_time, sort_id, controller))
+
+    def _unsafeDrainPending(self):
+        """Moves queued reschedule requests into the heap, or the paused set if we're paused. Assumes we're locked already."""
+        pending = self._pending
+        if not pending: return
+        # Coalesce so a burst of restart/resume calls on one controller only pushes its latest sort key,
+        # the earlier ones would just be popped and discarded as stale generations
+        latest_keys = {}
+        while pending:
+            controller, sort_key = pending.popleft()
+            latest_keys[controller] = sort_key
+
+        is_paused = self.isPaused()
+        for controller, sort_key in latest_keys.items():
+            self._unsafeReschedule(controller, sort_key, is_paused)
+
+    def _unsafeReschedule(self, controller: TaskController, sort_key, is_paused: bool):
+        """Pushes the controller to the heap, or the paused set if we're paused. Assumes we're locked already."""
+        if is_paused:
+            # If we're paused, add it to paused list so it will fire up when we resume
+            self._paused_tasks.add(controller)
+        else:
+            self._paused_tasks.discard(controller)
+            self._unsafePushController(controller, *sort_key)
 
-    def reloadControllers(self, controllers: List[TaskController]=None):
+    def reloadControllers(self, controllers: Iterable[TaskController]=None):
         """
         Replaces the entire task list in one go.
         Args:
@@ -53,27 +96,34 @@ class TaskWorker(QThread):
         """
         with QMutexLocker(self._mutex):
             prev_heap = self._task_heap
-            self._task_heap = []
+            self._pending.clear()
             if controllers:
                 # We don't use controller.restart here because that attempts to capture work mutex again.
-                for controller in controllers:
-                    self._unsafePushController(controller, *controller.resetGeneratorAndGetSortKey())
+                # Build the whole list first and heapify once, it's linear instead of a push per controller
+                new_heap = [(*controller.resetGeneratorAndGetSortKey(), controller) for controller in controllers]
+                heapq.heapify(new_heap)
+                self._task_heap = new_heap
             else:
+                self._task_heap = []
                 # Cleanup previous tasks that were going to run because we're stopping
                 for entry in prev_heap:
-                    entry[3].stop(True)
+                    entry[2].stop(True)
 
     def moveToActiveAndReschedule(self, controller: TaskController, sort_key):
         """Wakes a controller up and puts it back in the schedule."""
-        with QMutexLocker(self._mutex):
-            if not self.isAlive(): return
-            # Schedule only if we're not paused
-            if not self.isPaused():
-                self._paused_tasks.discard(controller)
-                self._unsafePushController(controller, *sort_key)
-            else:
-                # If we're paused, add it to paused list so it will fire up when we resume
-                self._paused_tasks.add(controller)
+        if not self.isAlive(): return
+        # From inside a task step the worker can't be contending for the lock, so push straight to the heap.
+        # tryLock fails instead of deadlocking if we're in a handler that already holds it.
+        if self.isWorkerThread() and self._mutex.tryLock():
+            try:
+                self._unsafeReschedule(controller, sort_key, self.isPaused())
+            finally:
+                self._mutex.unlock()
+            return
+
+        # Queued instead of locking, the run loop (or resume/end handlers) picks it up on their next pass
+        self._pending.append((controller, sort_key))
+        self._pending_signal.set()
 
     def _unsafeMoveToPaused(self, controller: TaskController):
         """Moves the controller to paused task list if it's not already there. Assumes we're locked already."""
@@ -87,13 +137,14 @@ class TaskWorker(QThread):
         forcefully_stopped = set()
         stopped_all = False
         with QMutexLocker(self._mutex):
+            self._unsafeDrainPending()
             # Snapshot the collections to protect if a task removes itself from the list/set during the 'throw'
             active_snapshot = list(self._task_heap)
             paused_snapshot = list(self._paused_tasks)
             self._task_heap.clear()  # Clear task heap because hard pause means things resume at their next cycle
             # Controllers in the active snapshot should be added to paused and handled
             for entry in active_snapshot:
-                controller = entry[3]
+                controller = entry[2]
                 # Only add to paused when hard pausing successful
                 if _handleTasksOnHard(controller, notified_tasks):
                     self._paused_tasks.add(controller)
@@ -118,16 +169,34 @@ class TaskWorker(QThread):
 
     def _handleNormalPausedEnd(self):
         with QMutexLocker(self._mutex):
+            self._unsafeDrainPending()
             active_snapshot = list(self._task_heap)
             self._task_heap.clear()
 
             for entry in active_snapshot:
-                controller = entry[3]
+                controller = entry[2]
                 controller.state_change_by_worker = True
                 self._paused_tasks.add(controller)
 
+    def resetAfterTerminate(self):
+        """
+        Readies a terminated worker to be started again, instead of replacing it.
+        Only call once wait() has confirmed the thread is gone.
+        """
+        self.state = WorkerState.IDLE
+        # The thread may have died holding the lock
+        self._mutex = QMutex()
+        self._task_heap = []
+        self._paused_tasks.clear()
+        self._pending.clear()
+        self._pending_signal.clear()
+        self._pause_timestamp = 0
+        self._thread_ident = None
+        self.last_heartbeat = time.perf_counter()
+
     def handleStoppedEnd(self):
         with QMutexLocker(self._mutex):
+            self._unsafeDrainPending()
             active_snapshot = list(self._task_heap)
             paused_snapshot = list(self._paused_tasks)
             self._task_heap.clear()
@@ -137,7 +206,7 @@ class TaskWorker(QThread):
             controller.stop(by_worker=True)
 
         for entry in active_snapshot:
-            controller = entry[3]
+            controller = entry[2]
             if controller.isAlive():
                 controller.stop(by_worker=True)
 
@@ -151,6 +220,7 @@ class TaskWorker(QThread):
             self._handleNormalPausedEnd()
 
     def run(self):
+        self._thread_ident = threading.get_ident()
         completed = False
         while self.isAlive() and not self.isPaused():
             self.last_heartbeat = time.perf_counter()
@@ -162,14 +232,15 @@ class TaskWorker(QThread):
                 task_heap = self._task_heap
                 if not self.isAlive() or self.isPaused():
                     break
+                self._unsafeDrainPending()
                 if task_heap:
-                    current_time = time.perf_counter()
-                    wake_time, cid, prev_gen, controller = task_heap[0]
+                    current_time = time.perf_counter_ns()
+                    wake_time, prev_sort_id, controller = task_heap[0]
                     controller_paused = controller.isPaused()
                     # Only check generations while the controller is not paused
-                    should_continue = controller_paused or prev_gen != controller.getGeneration()
+                    should_continue = controller_paused or prev_sort_id != controller.getSortId()
                     if wake_time <= current_time or should_continue:
-                        wake_time, cid, generation, controller = heapq.heappop(task_heap)
+                        wake_time, sort_id, controller = heapq.heappop(task_heap)
                         # If generations differ or controller paused, move to next and discard current
                         if should_continue:
                             if controller_paused: self._unsafeMoveToPaused(controller)
@@ -177,8 +248,7 @@ class TaskWorker(QThread):
                         should_sleep = False
                     else:
                         # WAIT: Calculate dynamic delay
-                        delay_sec = wake_time - current_time
-                        delay_ms = int(max(1, min(delay_sec * 1000, 50)))
+                        delay_ms = max(1, min((wake_time - current_time) // 1_000_000, 50))
                 elif self._paused_tasks:
                     # Garbage Collection: Find tasks that were STOPPED by the user while paused
                     dead_tasks = [c for c in self._paused_tasks if not c.isPaused()]
@@ -205,27 +275,37 @@ class TaskWorker(QThread):
 
             if not should_sleep:
                 try:
-                    # Run the task using next
-                    wait_duration = next(controller)
+                    # Run the task, unless it was reset between being popped and now
+                    wait_duration = controller.stepIfCurrent(sort_id)
+                    if wait_duration is STALE_STEP: continue
                     if wait_duration is None: wait_duration = 0
-                    new_wake_time = current_time + float(wait_duration)
+                    new_wake_time = current_time + int(float(wait_duration) * NS_PER_SECOND)
                     # Schedule it to run at the new time
                     controller.wake_time = new_wake_time
                     # Grab the lock again and push the controller
                     with QMutexLocker(self._mutex):
-                        self._unsafePushController(controller, wake_time=new_wake_time, cid=cid, generation=generation)
+                        self._unsafePushController(controller, wake_time=new_wake_time, sort_id=sort_id)
                 except StopIteration:
-                    # Controller completed all steps
+                    # Controller completed all steps. If it was reset mid-step, this was the old generator ending
+                    if controller.getSortId() != sort_id: continue
                     if controller.repeat:
                         # Throttle controller by adding slight delay before restarting
-                        controller.restart(time.perf_counter() + self.loop_delay)
+                        controller.restart(time.perf_counter_ns() + int(self.loop_delay * NS_PER_SECOND))
                     else:
                         controller.stop(state=TaskState.FINISHED)
+                except TaskInterruptedException:
+                    # The task interrupted itself and didn't handle it, unless this came from a replaced generator
+                    if controller.getSortId() != sort_id: continue
+                    controller.stop(state=TaskState.CRASHED)
+                    self.logControllerAborted(controller)
                 except Exception as e:
+                    # Closing or restarting mid-step can make the old generator raise, that's not the new run crashing
+                    if controller.getSortId() != sort_id: continue
                     controller.stop(state=TaskState.CRASHED)
                     controller.logError(f"{str(e)}")
             else:
-                self.msleep(delay_ms)
+                # Like msleep, but a queued reschedule (e.g. a threaded task finishing) cuts it short
+                if self._pending_signal.wait(delay_ms / 1000): self._pending_signal.clear()
 
         self._onRunEnd()
 
@@ -236,6 +316,10 @@ class TaskWorker(QThread):
             The duration paused for in seconds or ``None`` if not paused.
         """
         was_hard_pause = self.state == WorkerState.INTERRUPTED
+        if not self.isRunning():
+            # Requests queued while paused belong in the paused set, which gets rescheduled below
+            with QMutexLocker(self._mutex):
+                self._unsafeDrainPending()
         elapsed = self.clearPauseState() if not self.isRunning() else None
         if elapsed is not None:
             elapsed_on_soft = elapsed if was_hard_pause is False else None
@@ -255,14 +339,29 @@ class TaskWorker(QThread):
         self.start()
         return elapsed
 
+    def isWorkerThread(self):
+        """Returns ``True`` if called from inside the worker's run loop, i.e. from a task step."""
+        return threading.get_ident() == self._thread_ident
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, value: WorkerState):
+        self._state = value
+        self._state_flags = _STATE_FLAGS[value]
+        # Cut the run loop's idle wait short so a stop or pause lands within a step, not a whole wait
+        self._pending_signal.set()
+
     def isAlive(self):
-        return self.state != WorkerState.IDLE
+        return self._state_flags != 0
 
     def isPaused(self):
-        return self.state in (WorkerState.PAUSED, WorkerState.INTERRUPTED)
+        return (self._state_flags & _PAUSED_FLAG) != 0
 
     def isInterrupted(self):
-        return self.state == WorkerState.INTERRUPTED
+        return (self._state_flags & _INTERRUPTED_FLAG) != 0
 
     def pause(self, interrupt: bool=False):
         if not self.isAlive(): return False
@@ -277,7 +376,7 @@ class TaskWorker(QThread):
             self._handleInterruptedEnd()
 
         self.state = target_state
-        self._pause_timestamp = time.perf_counter()
+        self._pause_timestamp = time.perf_counter_ns()
         return True
 
     def clearPauseState(self, new_state: WorkerState=WorkerState.RUNNING):
@@ -288,9 +387,7 @@ class TaskWorker(QThread):
         was_paused = self.isPaused()
         self.state = new_state
         if not was_paused: return None
-        duration = time.perf_counter() - self._pause_timestamp
-
-        return duration
+        return (time.perf_counter_ns() - self._pause_timestamp) / NS_PER_SECOND
 
     @staticmethod
     def logControllerAborted(controller: "TaskController"):
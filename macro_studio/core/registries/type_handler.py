@@ -102,11 +102,8 @@ class GlobalTypeHandler:
     @classmethod
     def getTypeClass(cls, type_name: str):
         """Returns the type class for the name string if the type is registered"""
-        if type_name in cls._type_names_map:
-            return cls._type_names_map.get(type_name)
-
         # Fallback to str if unregistered type
-        return str
+        return cls._type_names_map.get(type_name, str)
 
     @classmethod
     def setIfEvals(cls, key, value, to_dict: dict[object, object], strict_eval=False):
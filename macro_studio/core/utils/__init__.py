@@ -1,9 +1,10 @@
 from .file_io import FileIO
 from .logger import global_logger
-from .generate_unique_name import generateUniqueName
+from .generate_unique_name import generateUniqueName, splitNameSuffix
 
 __all__ = [
     'FileIO',
     'global_logger',
-    'generateUniqueName'
+    'generateUniqueName',
+    'splitNameSuffix'
 ]
\ No newline at end of file
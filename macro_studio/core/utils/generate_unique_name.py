@@ -1,23 +1,36 @@
 import re
 from typing import Union, Iterable
 
+_SUFFIX_RE = re.compile(r"^(.*?)\s\((\d+)\)$")
 
-def generateUniqueName(existing: Union[set, dict, list, Iterable], base_name):
+
+def splitNameSuffix(name: str):
+    """
+    Splits a generated name into its core name and suffix number, so "Task (2)" becomes ("Task", 2).
+    Names without a suffix come back as (name, None).
+    """
+    match_existing = _SUFFIX_RE.match(name)
+    if match_existing:
+        return match_existing.group(1), int(match_existing.group(2))
+    return name, None
+
+
+def generateUniqueName(existing: Union[set, dict, list, Iterable], base_name, start: int = 1):
     """
     Generates a unique name by appending (1), (2), etc., if the base_name is taken.
+    Args:
+        existing: The names already taken.
+        base_name: The name to make unique.
+        start: The first number to try, for callers that know every lower one is taken.
     """
     if isinstance(existing, (set, dict)):
         existing_names = existing
     else:
         existing_names = set(existing)
 
-    match_existing = re.match(r"^(.*?)\s\(\d+\)$", base_name)
-    if match_existing:
-        core_name = match_existing.group(1)
-    else:
-        core_name = base_name
+    core_name = splitNameSuffix(base_name)[0]
 
-    i = 1
+    i = start
     test_name = base_name
     # If base_name exists, start appending numbers
     if base_name in existing_names:
@@ -27,4 +40,4 @@ def generateUniqueName(existing: Union[set, dict, list, Iterable], base_name):
                 break
             i += 1
 
-    return test_name
\ No newline at end of file
+    return test_name
@@ -240,9 +240,9 @@ class TaskHeaderWidget(QWidget):
         menu.exec(pos)
 
     def onImport(self):
-        filepath, _ = QFileDialog.getOpenFileName(self, "Import Task", "", "Task Files (*.task)")
-        if filepath:
-            self.tasks.importTask(filepath)
+        filepaths, _ = QFileDialog.getOpenFileNames(self, "Import Tasks", "", "Task Files (*.task)")
+        if filepaths:
+            self.tasks.importTasks(filepaths)
 
     def onExport(self):
         if not self.confirmDiscardChanges() or not self.tasks.getActiveTask(): return
@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING, Union
-from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex, QTimer
+from PySide6.QtCore import QAbstractTableModel, Qt, QModelIndex, QPersistentModelIndex, QTimer
 from PySide6.QtGui import QBrush, QColor
 
 from macro_studio.core.registries.capture_type_registry import GlobalCaptureRegistry
@@ -9,6 +9,9 @@ from macro_studio.ui.shared import EMPTY_VALUE_STR, IconColor
 if TYPE_CHECKING:
     from macro_studio.core.data import VariableStore, VariableConfig
 
+# Built once so flash emits don't wrap the role enum on every call
+_FLASH_ROLES = [int(Qt.ItemDataRole.BackgroundRole)]
+
 
 # Yeah, let's consider this a widget
 class VariableTableModel(QAbstractTableModel):
@@ -16,9 +19,18 @@ class VariableTableModel(QAbstractTableModel):
         super().__init__()
         self.store = variable_store
         self._keys_cache = list(self.store.keys())
-        self._flashing_index = None
+        self._flashing_index: QPersistentModelIndex | None = None
 
         self.columns = ["Variable ID", "Type", "Value"]
+        # Roles not in here return None without looking up the row's config
+        self._role_handlers = {
+            Qt.ItemDataRole.BackgroundRole: self._backgroundData,
+            Qt.ItemDataRole.ForegroundRole: self._foregroundData,
+            Qt.ItemDataRole.DisplayRole: self._displayData,
+            Qt.ItemDataRole.EditRole: self._editData,
+            Qt.ItemDataRole.CheckStateRole: self._checkStateData,
+            Qt.ItemDataRole.ToolTipRole: self._toolTipData,
+        }
 
         self.store.varAdded.connect(self._refreshData)
         self.store.varRemoved.connect(self._refreshData)
@@ -44,45 +56,56 @@ class VariableTableModel(QAbstractTableModel):
         return None
 
     def data(self, index, /, role = ...):
-        if not index.isValid():
+        handler = self._role_handlers.get(role)
+        if handler is None or not index.isValid():
             return None
 
          # Get the variable for this row
         var_name, config = self.getNameAndConfig(index.row())
+        return handler(index, var_name, config)
+
+    def _backgroundData(self, index, var_name, config):
+        flashing = self._flashing_index
+        if flashing and flashing.row() == index.row() and flashing.column() == index.column():
+            return QBrush(QColor("#FFCDD2"))
+        return None
+
+    def _foregroundData(self, index, var_name, config):
+        if index.column() == 1 and GlobalCaptureRegistry.containsType(config.data_type):
+            return QBrush(QColor(IconColor.SELECTED_HOVER))
+        elif index.column() == 2 and config.value is None:
+            return QBrush(QColor("gray"))
+        return None
 
-        match role:
-            case Qt.ItemDataRole.BackgroundRole:
-                if self._flashing_index and index == self._flashing_index:
-                    return QBrush(QColor("#FFCDD2"))
-            case Qt.ItemDataRole.ForegroundRole:
-                if index.column() == 1 and GlobalCaptureRegistry.containsType(config.data_type):
-                    return QBrush(QColor(IconColor.SELECTED_HOVER))
-                elif index.column() == 2 and config.value is None:
-                    return QBrush(QColor("gray"))
-            case Qt.ItemDataRole.DisplayRole:
-                if index.column() == 0:
-                    return var_name
-                elif index.column() == 1:
-                    return GlobalTypeHandler.getDisplayName(config.data_type)
-                elif index.column() == 2:
-                    if config.data_type is bool: return ""
-                    return GlobalTypeHandler.toString(config.value) or EMPTY_VALUE_STR
-            case Qt.ItemDataRole.EditRole:
-                if index.column() == 0:
-                    return var_name
-                elif index.column() == 2:
-                    if config.data_type is bool: return ""
-                    return GlobalTypeHandler.toString(config.value) or ""
-            case Qt.ItemDataRole.CheckStateRole:
-                if index.column() == 2 and config.data_type is bool:
-                    return Qt.CheckState.Checked if config.value else Qt.CheckState.Unchecked
-            case Qt.ItemDataRole.ToolTipRole:
-                if index.column() == 2:
-                    capture_mode = GlobalCaptureRegistry.getModeFromType(config.data_type)
-                    if capture_mode:
-                        return f"{GlobalCaptureRegistry.get(capture_mode).tip} | Right click to capture"
-                    return config.hint or "Manually edit this value"
+    def _displayData(self, index, var_name, config):
+        if index.column() == 0:
+            return var_name
+        elif index.column() == 1:
+            return GlobalTypeHandler.getDisplayName(config.data_type)
+        elif index.column() == 2:
+            if config.data_type is bool: return ""
+            return GlobalTypeHandler.toString(config.value) or EMPTY_VALUE_STR
+        return None
+
+    def _editData(self, index, var_name, config):
+        if index.column() == 0:
+            return var_name
+        elif index.column() == 2:
+            if config.data_type is bool: return ""
+            return GlobalTypeHandler.toString(config.value) or ""
+        return None
 
+    def _checkStateData(self, index, var_name, config):
+        if index.column() == 2 and config.data_type is bool:
+            return Qt.CheckState.Checked if config.value else Qt.CheckState.Unchecked
+        return None
+
+    def _toolTipData(self, index, var_name, config):
+        if index.column() == 2:
+            capture_mode = GlobalCaptureRegistry.getModeFromType(config.data_type)
+            if capture_mode:
+                return f"{GlobalCaptureRegistry.get(capture_mode).tip} | Right click to capture"
+            return config.hint or "Manually edit this value"
         return None
 
     def setData(self, index, value, /, role = ...):
@@ -132,16 +155,18 @@ class VariableTableModel(QAbstractTableModel):
 
     def triggerFlash(self, index):
         """Called when validation fails to start the flash effect."""
-        self._flashing_index = index
-        self.dataChanged.emit(index, index, [Qt.ItemDataRole.BackgroundRole])
+        # Persistent so the index stays valid if the layout changes before the flash clears
+        self._flashing_index = QPersistentModelIndex(index)
+        self.dataChanged.emit(index, index, _FLASH_ROLES)
         QTimer.singleShot(250, self._clearFlash)
 
     def _clearFlash(self):
         """Clears the flash and redraws the cell back to normal."""
         if self._flashing_index:
-            old_index = self._flashing_index
+            old_index = QModelIndex(self._flashing_index)
             self._flashing_index = None
-            self.dataChanged.emit(old_index, old_index, [Qt.ItemDataRole.BackgroundRole])
+            if old_index.isValid():
+                self.dataChanged.emit(old_index, old_index, _FLASH_ROLES)
 
     def getNameAndConfig(self, row: int):
         """Returns the name and full config object for the given row."""
@@ -1,24 +1,41 @@
-import cv2, pytesseract, mss
 import numpy as np
+from functools import lru_cache
 from PySide6.QtCore import QRect
-from PIL import Image
 
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract'
+TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract'
+
+# The OCR stack is heavy to import, so it's only loaded the first time it's needed
+cv2 = pytesseract = mss = Image = None
+
+def _ocrImports():
+    """Imports the OCR dependencies into module scope if they haven't been loaded yet."""
+    global cv2, pytesseract, mss, Image
+    if cv2 is not None: return
+
+    import cv2 as _cv2, pytesseract as _pytesseract, mss as _mss
+    from PIL import Image as _Image
+
+    _pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    pytesseract, mss, Image = _pytesseract, _mss, _Image
+    # Assigned last since it's the loaded flag
+    cv2 = _cv2
+
+@lru_cache(maxsize=32)
+def _buildRegion(top: int, left: int, width: int, height: int) -> dict:
+    """Returns a shared mss monitor dict for the bounds, so repeated captures of a fixed region reuse one object."""
+    return {"top": top, "left": left, "width": width, "height": height}
 
 def captureScreenText(bounds: QRect) -> str:
     """Capture a screenshot within the bounds and return the text within it."""
-    region = {
-        "top": bounds.top(),
-        "left": bounds.left(),
-        "width": bounds.width(),
-        "height": bounds.height(),
-    }
+    _ocrImports()
+    region = _buildRegion(bounds.top(), bounds.left(), bounds.width(), bounds.height())
     with mss.mss() as sct:
         screenshot = sct.grab(region)
 
-    np_img = np.array(screenshot)
-    bgr_img = np_img[..., :3]
-    gray = cv2.cvtColor(bgr_img, cv2.COLOR_BGR2GRAY)
-    # Use binary thresh to improve ocr accuracy
-    _, binary = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY)
-    return pytesseract.image_to_string(Image.fromarray(binary)).strip()
\ No newline at end of file
+    # View the raw BGRA buffer in place rather than copying it into a new array
+    np_img = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(screenshot.height, screenshot.width, 4)
+    # Convert straight from BGRA so cv2 doesn't have to copy a non-contiguous BGR slice first
+    gray = cv2.cvtColor(np_img, cv2.COLOR_BGRA2GRAY)
+    # Use binary thresh to improve ocr accuracy, writing back into the gray buffer
+    cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY, dst=gray)
+    return pytesseract.image_to_string(Image.fromarray(gray)).strip()
\ No newline at end of file